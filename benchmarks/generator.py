@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import random
+import string
+from dataclasses import dataclass
+from itertools import product
+from typing import Literal
+
+OperatorMix = Literal["mixed", "and-or", "implication"]
+Spelling = Literal["symbols", "words", "mixed"]
+
+operator_mixes: dict[OperatorMix, tuple[str, ...]] = {
+    "mixed": ("and", "or", "then", "only_if"),
+    "and-or": ("and", "or"),
+    "implication": ("then", "only_if"),
+}
+"Binary operators used by each operator mix"
+
+symbol_spellings: dict[str, tuple[str, ...]] = {
+    "not": ("!", "~", "¬"),
+    "and": ("&", "&&", "^", "∧"),
+    "or": ("|", "||", "∨"),  # noqa: RUF001
+    "then": ("->", ">", "→"),
+    "only_if": ("<->", "==", "<>", "↔"),
+}
+
+word_spellings: dict[str, tuple[str, ...]] = {
+    "not": ("NOT", "not"),
+    "and": ("AND", "and"),
+    "or": ("OR", "or"),
+    "then": ("THEN", "IF", "then"),
+    "only_if": ("IFF", "ONLY IF", "iff"),
+}
+
+keywords = {"AND", "OR", "NOT", "THEN", "IF", "IFF", "ONLY"}
+"Words which are operators instead of variables"
+
+unary_chance = 0.15
+"Chance of a node being negated instead of being a binary operator"
+
+
+@dataclass(frozen=True)
+class FormulaSpec:
+    """Shape of the random formulas of a benchmark case."""
+
+    variables: int
+    "Count of distinct variables, so the truth table has 2^variables rows"
+
+    depth: int
+    "Maximum depth of the operators"
+
+    mix: OperatorMix = "mixed"
+    spelling: Spelling = "mixed"
+
+    @property
+    def name(self) -> str:
+        """Short description of the case."""
+        return f"v{self.variables}-d{self.depth}-{self.mix}-{self.spelling}"
+
+
+def variable_names(count: int) -> list[str]:
+    """Get `count` distinct variable names which aren't operator keywords."""
+    # `V` is excluded since it's also spelled as the `or` operator
+    letters = [x for x in string.ascii_uppercase if x != "V"]
+    names: list[str] = []
+    for size in range(1, 4):
+        words = ("".join(x) for x in product(letters, repeat=size))
+        names += [x for x in words if x not in keywords]
+        if len(names) >= count:
+            break
+    return names[:count]
+
+
+class FormulaGenerator:
+    """Seeded generator of random formulas, always using all of their variables."""
+
+    rng: random.Random
+    spec: FormulaSpec
+    pending: list[str]
+    "Variables not used yet, used first by the next leaves"
+
+    def __init__(self, spec: FormulaSpec, seed: int = 0) -> None:  # noqa: D107
+        self.rng = random.Random(seed)  # noqa: S311
+        self.spec = spec
+        self.pending = []
+
+    def spell(self, operator: str) -> str:
+        """Pick a spelling of an operator according to the spelling of the case."""
+        spelling = self.spec.spelling
+        if spelling == "mixed":
+            spelling = self.rng.choice(("symbols", "words"))
+        spellings = symbol_spellings if spelling == "symbols" else word_spellings
+        return self.rng.choice(spellings[operator])
+
+    def leaf(self) -> str:
+        """Pick an unused variable first, or else a random variable."""
+        if self.pending:
+            return self.pending.pop()
+        return self.rng.choice(variable_names(self.spec.variables))
+
+    def node(self, depth: int) -> str:
+        """Generate a random sub-formula of at most the given depth."""
+        if depth == 0:
+            return self.leaf()
+        if self.rng.random() < unary_chance:
+            return f"{self.spell('not')} ({self.node(depth - 1)})"
+
+        operator = self.rng.choice(operator_mixes[self.spec.mix])
+        left, right = self.node(depth - 1), self.node(depth - 1)
+        return f"({left}) {self.spell(operator)} ({right})"
+
+    def formula(self) -> str:
+        """Generate a random formula using all the variables of the case."""
+        self.pending = variable_names(self.spec.variables)
+        self.rng.shuffle(self.pending)
+        formula = self.node(self.spec.depth)
+
+        # join the variables which didn't fit in the leaves of the formula
+        while self.pending:
+            operator = self.rng.choice(operator_mixes[self.spec.mix])
+            formula = f"({formula}) {self.spell(operator)} {self.leaf()}"
+        return formula
+
+
+def generate_formulas(spec: FormulaSpec, count: int, seed: int = 0) -> list[str]:
+    # wrapper function for convenience
+    generator = FormulaGenerator(spec, seed)
+    return [generator.formula() for _ in range(count)]
@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import gc
+import io
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.generator import FormulaSpec, generate_formulas
+from ttg.console import rich_console
+from ttg.core.bitwise import evaluate_packed, evaluate_parallel
+from ttg.core.evaluator import (
+    Evaluator,
+    TruthTable,
+    evaluate,
+    formula_variables,
+    iter_truth_table_variables,
+)
+from ttg.core.incremental import evaluate_gray
+from ttg.core.lexer import tokenize
+from ttg.core.parser import parse
+from ttg.core.table import PackedTruthTable
+from ttg.formatter import format_truth_table
+from ttg.renderer import render_plain
+
+if TYPE_CHECKING:
+    from benchmarks.generator import OperatorMix, Spelling
+    from ttg.core.lexer import Token
+    from ttg.core.parser import Expr
+    from ttg.core.table import TruthTableLike
+
+Engine = Callable[["list[Token]", "Expr"], "TruthTableLike"]
+
+T = TypeVar("T")
+
+slow_max_rows = 1 << 14
+"Maximum count of rows evaluated by the engines which evaluate the tree per row"
+
+format_max_rows = 1 << 12
+"Maximum count of rows rendered with `rich`, which lays out the entire table"
+
+
+def evaluate_interpreter(tokens: list[Token], tree: Expr) -> TruthTable:
+    """Evaluate the truth table by interpreting the tree once per row."""
+    variables = formula_variables(tokens)
+    table: TruthTable = {}
+    evaluator = Evaluator()
+    for values in iter_truth_table_variables(variables):
+        for key, value in evaluator.evaluate(tree, values).items():
+            table.setdefault(key, []).append(value)
+    return table
+
+
+def evaluate_windows(tokens: list[Token], tree: Expr) -> PackedTruthTable:
+    """Evaluate the windows of rows of the truth table across 4 processes.
+
+    The processes are started for any count of variables, so that the pool is
+    measured even for the small tables which `--jobs` evaluates in-process.
+    """
+    return evaluate_parallel(tokens, tree, workers=4, min_variables=0)
+
+
+engines: dict[str, tuple[Engine, int | None]] = {
+    "interpreter": (evaluate_interpreter, slow_max_rows),
+    "gray": (evaluate_gray, slow_max_rows),
+    "compiled": (evaluate, None),
+    "parallel": (evaluate_windows, None),
+    "bitwise": (evaluate_packed, None),
+}
+"Each evaluation engine & the maximum count of rows it's benchmarked with"
+
+reference_engine = "interpreter"
+"Engine which the outputs & the speed of the other engines are compared to"
+
+
+@dataclass
+class Measurement:
+    """Result of benchmarking a single phase of a case."""
+
+    case: str
+    phase: str
+
+    seconds: float
+    "Best wall time out of the repeats"
+
+    peak_bytes: int
+    "Peak of the memory allocated during a separate run"
+
+    rows: int
+    "Count of rows of the truth tables processed by the phase, if any"
+
+    @property
+    def rows_per_second(self) -> float:  # noqa: D102
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def measure(function: Callable[[], T], repeat: int) -> tuple[float, int, T]:
+    """Time a function (best of `repeat`), then trace the peak of its allocations.
+
+    The allocations are traced in a separate run since tracing them slows down
+    the function by a lot.
+    """
+    timings: list[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak, result  # type: ignore reportPossiblyUnbound
+
+
+def run_case(
+    spec: FormulaSpec,
+    formulas: list[str],
+    selected: list[str],
+    repeat: int,
+) -> list[Measurement]:
+    """Benchmark each phase over the formulas of a case."""
+    rows = len(formulas) << spec.variables
+    results: list[Measurement] = []
+
+    def record(phase: str, function: Callable[[], T], count: int = 0) -> T:
+        seconds, peak, result = measure(function, repeat)
+        results.append(Measurement(spec.name, phase, seconds, peak, count))
+        return result
+
+    tokens = record("tokenize", lambda: [tokenize(f) for f in formulas])
+    trees = record("parse", lambda: [parse(t) for t in tokens])
+    inputs = list(zip(tokens, trees))
+
+    expected: list[PackedTruthTable] | None = None
+    for name in selected:
+        engine, max_rows = engines[name]
+        if max_rows is not None and (1 << spec.variables) > max_rows:
+            continue
+        phase = f"evaluate:{name}"
+        tables = record(phase, lambda e=engine: [e(*x) for x in inputs], rows)
+        packed = [PackedTruthTable.from_table(table) for table in tables]
+        if expected is None:
+            expected = packed
+        elif packed != expected:
+            raise Exception("Engine returned a different truth table", name)
+
+    tables = [evaluate_packed(*x) for x in inputs]
+    if (1 << spec.variables) <= format_max_rows:
+        console = Console(file=io.StringIO(), width=200)
+        record(
+            "format:rich",
+            lambda: [console.print(format_truth_table(t)) for t in tables],
+            rows,
+        )
+    record(
+        "format:plain",
+        lambda: [render_plain(t, io.BytesIO()) for t in tables],
+        rows,
+    )
+    return results
+
+
+def compare(
+    results: list[Measurement],
+    baseline: list[Measurement],
+    threshold: float,
+) -> list[tuple[Measurement, float]]:
+    """Find the phases which are slower than the baseline by more than the threshold."""
+    previous = {(x.case, x.phase): x for x in baseline}
+    regressions: list[tuple[Measurement, float]] = []
+    for result in results:
+        before = previous.get((result.case, result.phase))
+        if before is None or not before.seconds:
+            continue
+        ratio = result.seconds / before.seconds
+        if ratio > threshold:
+            regressions.append((result, ratio))
+    return regressions
+
+
+def display_results(results: list[Measurement]) -> None:
+    """Print the measurements, with the speedup of the engines over the reference."""
+    references = {
+        x.case: x.seconds for x in results if x.phase == f"evaluate:{reference_engine}"
+    }
+
+    table = Table(title="Benchmarks")
+    for column in ("Case", "Phase", "Time (ms)", "Rows/s", "Peak (KiB)", "Speedup"):
+        justify = "left" if column in ("Case", "Phase") else "right"
+        table.add_column(column, justify=justify)
+    for x in results:
+        reference = references.get(x.case)
+        speedup = ""
+        if x.phase.startswith("evaluate:") and reference and x.seconds:
+            speedup = f"{reference / x.seconds:.1f}x"
+        table.add_row(
+            x.case,
+            x.phase,
+            f"{x.seconds * 1000:.2f}",
+            f"{x.rows_per_second:,.0f}" if x.rows else "",
+            f"{x.peak_bytes / 1024:,.0f}",
+            speedup,
+        )
+    rich_console.print(table)
+
+
+@click.command("benchmarks")
+@click.option("--seed", type=int, default=0, help="Seed of the random formulas.")
+@click.option(
+    "--variables",
+    default="4,8,12,16",
+    help="Comma-separated counts of variables of each case.",
+)
+@click.option(
+    "--depth",
+    type=click.IntRange(min=0),
+    default=6,
+    help="Depth of the formulas.",
+)
+@click.option(
+    "--mix",
+    type=click.Choice(["mixed", "and-or", "implication"]),
+    default="mixed",
+    help="Binary operators used by the formulas.",
+)
+@click.option(
+    "--spelling",
+    type=click.Choice(["symbols", "words", "mixed"]),
+    default="mixed",
+    help="Spelling of the operators of the formulas.",
+)
+@click.option(
+    "--count",
+    type=click.IntRange(min=1),
+    default=5,
+    help="Formulas per case.",
+)
+@click.option("--repeat", type=click.IntRange(min=1), default=3, help="Runs per phase.")
+@click.option(
+    "--engines",
+    "selected",
+    default=",".join(engines),
+    help="Comma-separated evaluation engines to benchmark.",
+)
+@click.option(
+    "--json",
+    "json_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the results as JSON.",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Compare with the JSON results of a previous run.",
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=1.25,
+    help="Fail if a phase is slower than the baseline by this factor.",
+)
+def command(  # noqa: PLR0913
+    seed: int,
+    variables: str,
+    depth: int,
+    mix: OperatorMix,
+    spelling: Spelling,
+    count: int,
+    repeat: int,
+    selected: str,
+    json_path: Path | None,
+    baseline: Path | None,
+    threshold: float,
+) -> None:
+    names = [x.strip() for x in selected.split(",") if x.strip()]
+    unknown = [x for x in names if x not in engines]
+    if unknown:
+        raise click.BadParameter(f"Unknown engine(s): {', '.join(unknown)}")
+
+    results: list[Measurement] = []
+    for size in (int(x) for x in variables.split(",")):
+        spec = FormulaSpec(size, depth, mix, spelling)
+        formulas = generate_formulas(spec, count, seed)
+        results += run_case(spec, formulas, names, repeat)
+    display_results(results)
+
+    data = {
+        "seed": seed,
+        "python": sys.version.split()[0],
+        "results": [asdict(x) for x in results],
+    }
+    if json_path is not None:
+        json_path.write_text(json.dumps(data, indent=2))
+
+    if baseline is not None:
+        previous = json.loads(baseline.read_text())["results"]
+        regressions = compare(results, [Measurement(**x) for x in previous], threshold)
+        for result, ratio in regressions:
+            rich_console.print(
+                f"Regression: {result.case} {result.phase} is {ratio:.2f}x slower",
+                style="bold red",
+            )
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from ttg.batch import BatchRunner
+
+
+def test_failed_lines_sharing_a_key_keep_their_own_errors() -> None:
+    lines = ["p & 1", "p & 2", "p &", "p and", "p & 1"]
+    results = list(BatchRunner().run(lines))
+
+    assert [result["tokens"] for result in results] == [
+        ["1"],
+        ["2"],
+        ["&"],
+        ["and"],
+        ["1"],
+    ]
+    assert [result["line"] for result in results] == [1, 2, 3, 4, 5]
+
+
+def test_valid_lines_sharing_a_key_are_evaluated_once() -> None:
+    runner = BatchRunner()
+    results = list(runner.run(["P & Q", "P and Q", "p & 1", "P  &  Q"]))
+
+    assert [result.get("true_rows") for result in results] == [1, 1, None, 1]
+    assert runner.summary.formulas == 4
+    assert runner.summary.unique == 2
+    assert runner.summary.failures == 1
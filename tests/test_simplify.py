@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from ttg.core.lexer import tokenize
+from ttg.core.parser import parse
+from ttg.core.simplify import simplify
+
+
+def simplified(formula: str) -> str:
+    return str(simplify(parse(tokenize(formula))))
+
+
+def test_absorption_checks_every_operand_of_a_chain() -> None:
+    assert simplified("(P | Q) & R & P") == "R & P"
+    assert simplified("P & R & (P | Q)") == "P & R"
+    assert simplified("(P & Q) | R | P") == "R | P"
+    assert simplified("A & B & (A | C) & (B | D)") == "A & B"
+
+
+def test_absorption_compares_whole_dual_chains() -> None:
+    assert simplified("(P | Q | R) & (P | Q)") == "P | Q"
+    assert simplified("P & (Q | !P)") == "P & (Q | !P)"
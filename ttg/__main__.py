@@ -1,5 +1,6 @@
 import os
 import sys
+from multiprocessing import freeze_support
 from pathlib import Path
 
 sys.path.append(os.getcwd())  # noqa: PTH109
@@ -10,4 +11,5 @@ sys.path.append(
 from ttg.command import command
 
 if __name__ == "__main__":
+    freeze_support()  # for process pools in pyinstaller executables
     command()
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from typing import IO, Dict, Iterable, Iterator, List, Tuple, Union
+
+from rich.table import Table
+
+from ttg.console import rich_console_error
+from ttg.core.bdd import count_models
+from ttg.core.cache import CacheKey, cache_key
+from ttg.core.evaluator import formula_variables
+from ttg.core.lexer import tokenize, tokenize_many
+from ttg.core.parser import ParserError, parse
+
+BatchResult = Dict[str, Union[str, int, List[str]]]
+"""
+The Batch Result type is the JSON record of a single formula, either its counts
+of rows & its classification, or the error which stopped it from being parsed.
+"""
+
+BatchLine = Tuple[int, str, CacheKey]
+"The line number, the formula & the cache key of each formula of a chunk"
+
+chunk_size = 256
+"Count of lines read & sent to a process at a time"
+
+
+def check_formula(formula: str) -> BatchResult:
+    """Classify a single formula by counting the rows for which it's `True`.
+
+    The rows are counted with the Binary Decision Diagram of the formula, so
+    the truth table is never evaluated row by row.
+    """
+    tokens = tokenize(formula)
+    invalid = [token.value for token in tokens if token.type == "invalid"]
+    if invalid:
+        return {"error": "Invalid Token(s) Found", "tokens": invalid}
+    try:
+        tree = parse(tokens)
+    except ParserError as exc:
+        return {"error": exc.message, "tokens": [exc.token.value]}
+
+    variables = formula_variables(tokens)
+    rows, true_rows = 1 << len(variables), count_models(tree)
+    result = "contingent"
+    if true_rows == rows:
+        result = "tautology"
+    elif true_rows == 0:
+        result = "contradiction"
+    return {
+        "variables": variables,
+        "rows": rows,
+        "true_rows": true_rows,
+        "result": result,
+    }
+
+
+def check_formulas(formulas: list[str]) -> list[BatchResult]:
+    """Classify each formula of a chunk, e.g. in a separate process."""
+    return [check_formula(formula) for formula in formulas]
+
+
+@dataclass
+class BatchSummary:
+    """Counts of a finished batch."""
+
+    formulas: int = 0
+    "Count of the non-empty lines"
+
+    unique: int = 0
+    "Count of the formulas which were evaluated, after removing the duplicates"
+
+    failures: int = 0
+    "Count of the lines which couldn't be parsed"
+
+    seconds: float = 0.0
+
+    @property
+    def formulas_per_second(self) -> float:  # noqa: D102
+        return self.formulas / self.seconds if self.seconds else 0.0
+
+
+class BatchRunner:
+    """Runner classifying the formulas of each line of a stream in parallel.
+
+    The lines are read lazily in chunks, and formulas with the same cache key
+    as a previous line (e.g. only differing in whitespace or in the spelling of
+    their operators) are only evaluated once, unless they fail since their
+    errors point at their own tokens. Each chunk of new formulas is
+    evaluated in a process pool, while only a few chunks are pending at a time
+    so that the results are yielded in the order of the lines as they finish.
+    """
+
+    jobs: int
+    summary: BatchSummary
+    results: dict[CacheKey, BatchResult]
+
+    formulas: dict[CacheKey, str]
+    "The first formula evaluated for each cache key"
+
+    def __init__(self, jobs: int = 1) -> None:  # noqa: D107
+        self.jobs = jobs
+        self.summary = BatchSummary()
+        self.results = {}
+        self.formulas = {}
+
+    def run(self, lines: Iterable[str]) -> Iterator[BatchResult]:
+        """Yield the result of each formula in the order of the lines."""
+        started = time.perf_counter()
+        try:
+            if self.jobs <= 1:
+                for chunk, formulas in self.chunks(lines):
+                    yield from self.collect(chunk, check_formulas(formulas))
+                return
+
+            pending: deque[tuple[list[BatchLine], Future[list[BatchResult]]]]
+            pending = deque()
+            with ProcessPoolExecutor(self.jobs) as executor:
+                for chunk, formulas in self.chunks(lines):
+                    pending.append((chunk, executor.submit(check_formulas, formulas)))
+                    # keep a few chunks per process queued up, but no more
+                    while len(pending) > self.jobs * 2:
+                        done, future = pending.popleft()
+                        yield from self.collect(done, future.result())
+                while pending:
+                    done, future = pending.popleft()
+                    yield from self.collect(done, future.result())
+        finally:
+            self.summary.seconds = time.perf_counter() - started
+
+    def chunks(
+        self,
+        lines: Iterable[str],
+    ) -> Iterator[tuple[list[BatchLine], list[str]]]:
+        """Split the lines into chunks, along with their formulas not seen before."""
+        numbered = enumerate(lines, 1)
+        seen: set[CacheKey] = set()
+        while True:
+            lines_chunk = list(islice(numbered, chunk_size))
+            if not lines_chunk:
+                return
+
+            chunk: list[BatchLine] = []
+            formulas: list[str] = []
+            stripped = ((number, line.strip()) for number, line in lines_chunk)
+            numbered_formulas = [(number, text) for number, text in stripped if text]
+            tokens = tokenize_many(formula for _, formula in numbered_formulas)
+            for (number, formula), formula_tokens in zip(numbered_formulas, tokens):
+                key = cache_key(formula_tokens)
+                chunk.append((number, formula, key))
+                if key not in seen:
+                    seen.add(key)
+                    formulas.append(formula)
+            if chunk:
+                yield chunk, formulas
+
+    def collect(
+        self,
+        chunk: list[BatchLine],
+        results: list[BatchResult],
+    ) -> Iterator[BatchResult]:
+        """Store the results of the new formulas, then yield each line's result.
+
+        The error of a failed formula is only reused for the same text, since
+        formulas sharing its key may have other invalid tokens or spellings.
+        """
+        new: dict[CacheKey, str] = {}
+        for _, formula, key in chunk:
+            if key not in self.results:
+                new.setdefault(key, formula)
+        self.results.update(zip(new, results))
+        self.formulas.update(new)
+        self.summary.unique += len(results)
+
+        for number, formula, key in chunk:
+            result = self.results[key]
+            if "error" in result and formula != self.formulas[key]:
+                result = check_formula(formula)
+            self.summary.formulas += 1
+            self.summary.failures += "error" in result
+            yield {"line": number, "formula": formula, **result}
+
+
+def format_summary(summary: BatchSummary) -> Table:
+    """Format the counts of a finished batch for console display."""
+    table = Table(title="Batch Summary")
+    table.add_column("Formulas", justify="right")
+    table.add_column("Unique", justify="right")
+    table.add_column("Failures", justify="right")
+    table.add_column("Time (s)", justify="right")
+    table.add_column("Formulas/s", justify="right")
+    table.add_row(
+        f"{summary.formulas:,}",
+        f"{summary.unique:,}",
+        f"{summary.failures:,}",
+        f"{summary.seconds:.3f}",
+        f"{summary.formulas_per_second:,.0f}",
+    )
+    return table
+
+
+def run_batch(lines: Iterable[str], file: IO[str], jobs: int = 1) -> BatchSummary:
+    # wrapper function for convenience, writes each result as a JSON line then
+    # prints the summary to the standard error
+    runner = BatchRunner(jobs)
+    for result in runner.run(lines):
+        file.write(json.dumps(result, ensure_ascii=False) + "\n")
+    rich_console_error.print(format_summary(runner.summary))
+    return runner.summary
@@ -1,10 +1,31 @@
+from __future__ import annotations
+
 import sys
+from contextlib import ExitStack
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
 
+from ttg.batch import run_batch
 from ttg.console import rich_console
-from ttg.program import program
+from ttg.core.cache import FormulaCache
+from ttg.core.minimize import exact_variables
+from ttg.exporter import format_from_path
+from ttg.profiler import Profiler
+from ttg.program import (
+    ProgramOptions,
+    evaluate_shared,
+    program,
+    program_file,
+    shared_formulas,
+)
+
+if TYPE_CHECKING:
+    from ttg.core.minimize import NormalForm
+    from ttg.core.sat import CheckMode
+    from ttg.exporter import OutputFormat
+    from ttg.renderer import CellStyle, Renderer
 
 hero = r"""
  ______   ______   ______   
@@ -20,34 +41,191 @@ hero = r"""
 @click.command("tgg")
 @click.argument("input", required=False)
 @click.option("-f", "--file", is_flag=True, help="Treats the input as a filepath.")
+@click.option(
+    "-b",
+    "--batch",
+    is_flag=True,
+    help="Only classify each formula of the file (or `-` for stdin) as JSON lines.",
+)
 @click.option("-i", "--inspect", is_flag=True, help="Display debug data.")
-def command(input: str, file: bool = False, inspect: bool = False) -> None:
+@click.option(
+    "-p",
+    "--profile",
+    is_flag=True,
+    help="Display the time & memory of each phase, measuring memory in a second run.",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the cProfile stats of the run into a .prof file.",
+)
+@click.option(
+    "-s",
+    "--stream",
+    is_flag=True,
+    help="Print the rows as they are evaluated.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Count of processes to evaluate the rows with.",
+)
+@click.option(
+    "--simplify",
+    is_flag=True,
+    help="Rewrite the formula into a smaller equivalent formula first.",
+)
+@click.option(
+    "--minimize",
+    type=click.Choice(["dnf", "cnf"]),
+    help="Only derive a minimized DNF or CNF of the formula.",
+)
+@click.option(
+    "--exact-variables",
+    type=click.IntRange(min=0),
+    default=exact_variables,
+    show_default=True,
+    help="Largest count of variables minimized exactly (Quine-McCluskey).",
+)
+@click.option(
+    "-c",
+    "--check",
+    type=click.Choice(["sat", "taut", "contra"]),
+    help="Only check if satisfiable, a tautology, or a contradiction.",
+)
+@click.option(
+    "-e",
+    "--equiv",
+    metavar="FORMULA",
+    help="Only check if equivalent to another formula.",
+)
+@click.option(
+    "-w",
+    "--where",
+    metavar="true|false|FORMULA",
+    help="Only keep the rows where the formula or another formula is true/false.",
+)
+@click.option(
+    "-l",
+    "--limit",
+    type=click.IntRange(min=0),
+    help="Stop evaluating once this count of rows is kept.",
+)
+@click.option(
+    "--columns",
+    metavar="vars,final,FORMULA,...",
+    help="Only keep the selected columns.",
+)
+@click.option(
+    "--open",
+    "open_path",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Display a truth table file written with `--output-format bin`.",
+)
+@click.option(
+    "--rows",
+    metavar="START:STOP",
+    help="Only evaluate or display the rows from START to STOP.",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(["csv", "jsonl", "bin"]),
+    help="Write the truth table in this format instead of printing it.",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the truth table into a file instead of the standard output.",
+)
+@click.option(
+    "--renderer",
+    type=click.Choice(["auto", "rich", "plain"]),
+    default="auto",
+    help="Print with rich, or as faster plain text (auto: plain for large tables).",
+)
+@click.option(
+    "--cells",
+    type=click.Choice(["tf", "10"]),
+    default="tf",
+    help="Print plain text cells as T/F or 1/0.",
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Persist the evaluated formulas into a directory.",
+)
+def command(  # noqa: PLR0913
+    input: str,
+    file: bool = False,
+    batch: bool = False,
+    inspect: bool = False,
+    profile: bool = False,
+    profile_output: Path | None = None,
+    stream: bool = False,
+    jobs: int = 1,
+    simplify: bool = False,
+    minimize: NormalForm | None = None,
+    exact_variables: int = exact_variables,
+    check: CheckMode | None = None,
+    equiv: str | None = None,
+    where: str | None = None,
+    limit: int | None = None,
+    columns: str | None = None,
+    open_path: Path | None = None,
+    rows: str | None = None,
+    output_format: OutputFormat | None = None,
+    output: Path | None = None,
+    renderer: Renderer = "auto",
+    cells: CellStyle = "tf",
+    cache_dir: Path | None = None,
+) -> None:
+    if output is not None and output_format is None and not batch:
+        output_format = infer_output_format(output)
+
+    options = ProgramOptions(
+        stream=stream,
+        jobs=jobs,
+        simplify=simplify,
+        minimize=minimize,
+        exact_variables=exact_variables,
+        check=check,
+        equiv=equiv,
+        where=where,
+        limit=limit,
+        columns=columns,
+        rows=rows,
+        output_format=output_format,
+        output=output,
+        renderer=renderer,
+        cells=cells,
+    )
+
+    # Measure each phase of the program while profiling
+    if profile or profile_output:
+        options.hooks = Profiler(profile_output)
+
+    # Reuse the results of repeated formulas from a file or a cache directory
+    if file or cache_dir:
+        options.cache = FormulaCache(directory=cache_dir)
+
+    # If a truth table file is given, display it without evaluating anything
+    if open_path is not None:
+        program_file(open_path, inspect, options)
+
     # If input is a filepath, read formulas from file
-    if file:
+    elif file:
         if not input:
             rich_console.print("Error: No `input` filepath provided", style="bold red")
             sys.exit(-1)
 
-        filepath = Path(input)
-
-        try:
-            if not filepath.exists():
-                raise Exception(f"'{filepath.absolute()}' does not exist")
-            if not filepath.is_file() or not filepath.name.endswith(".txt"):
-                raise Exception("The provided input file is not a '.txt' file")
-        except Exception as exc:
-            rich_console.print()
-            rich_console.print(f"{exc.__class__.__name__}: ", style="bold red", end="")
-            rich_console.print(exc)
-            sys.exit(-1)
-
-        formulas = filepath.read_text().splitlines()
-        for formula in formulas:
-            program(formula, inspect)
+        program_formulas(input, batch, inspect, options)
 
     # If input exists, assume its a formula and run program once
     elif input:
-        program(input, inspect)
+        program(input, inspect, options)
 
     # Else, run program in interactive mode
     else:
@@ -58,9 +236,85 @@ def command(input: str, file: bool = False, inspect: bool = False) -> None:
             formula = rich_console.input(
                 "Enter a [bright_magenta italic]formula[/bright_magenta italic]: ",
             )
-            program(formula, inspect)
+            program(formula, inspect, options)
 
             rich_console.print()
             yesno = rich_console.input("Would you like to try again? (Y/N): ")
             if yesno.lower() != "y":
                 break
+
+
+def program_formulas(
+    filepath: str,
+    batch: bool,
+    inspect: bool,
+    options: ProgramOptions,
+) -> None:
+    """Run the program for each formula of a text file, or else run a batch."""
+    if batch:
+        program_batch(filepath, options.output, options.jobs)
+        return
+
+    formulas = read_formulas(Path(filepath))
+    output = options.output
+    for index, formula in enumerate(formulas, 1):
+        # evaluate the next formulas together, sharing their sub-expressions
+        start = index - 1
+        if start % shared_formulas == 0:
+            evaluate_shared(formulas[start : start + shared_formulas], options)
+
+        # write each truth table into its own numbered output file
+        if output is not None and len(formulas) > 1:
+            options.output = numbered_path(output, index)
+        program(formula, inspect, options)
+
+
+def program_batch(filepath: str, output: Path | None, jobs: int) -> None:
+    """Classify each formula of a text file, or of stdin, into JSON lines."""
+    with ExitStack() as stack:
+        lines = sys.stdin
+        if filepath != "-":
+            validate_filepath(Path(filepath))
+            lines = stack.enter_context(Path(filepath).open(encoding="utf-8"))
+
+        file = sys.stdout
+        if output is not None:
+            file = stack.enter_context(output.open("w", encoding="utf-8"))
+        run_batch(lines, file, jobs)
+
+
+def read_formulas(filepath: Path) -> list[str]:
+    """Read the formulas from each line of a text file, or exit on errors."""
+    validate_filepath(filepath)
+    return filepath.read_text().splitlines()
+
+
+def validate_filepath(filepath: Path) -> None:
+    """Check that the file of formulas is an existing text file, or exit."""
+    try:
+        if not filepath.exists():
+            raise Exception(f"'{filepath.absolute()}' does not exist")
+        if not filepath.is_file() or not filepath.name.endswith(".txt"):
+            raise Exception("The provided input file is not a '.txt' file")
+    except Exception as exc:
+        rich_console.print()
+        rich_console.print(f"{exc.__class__.__name__}: ", style="bold red", end="")
+        rich_console.print(exc)
+        sys.exit(-1)
+
+
+def infer_output_format(output: Path) -> OutputFormat:
+    """Infer the format of the output file from its extension, or exit if unknown."""
+    output_format = format_from_path(output)
+    if output_format is None:
+        rich_console.print(
+            "Error: Unknown `--output` extension, use `--output-format`",
+            style="bold red",
+        )
+        sys.exit(-1)
+    return output_format
+
+
+def numbered_path(path: Path, index: int) -> Path:
+    """Insert an index before the extension of a file (e.g. `table-1.csv`)."""
+    return path.with_name(f"{path.stem}-{index}{path.suffix}")
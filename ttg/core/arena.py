@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Hashable, Literal
+
+from ttg.core.parser import BinaryExpr, Expr, GroupExpr, UnaryExpr, VariableExpr
+
+if TYPE_CHECKING:
+    from ttg.core.lexer import TokenType
+
+NodeKind = Literal["variable", "group", "unary", "binary"]
+
+NO_NODE = -1
+"Placeholder for the missing operands of a node"
+
+
+class ExprArena:
+    """Array-backed & hash-consed representation of Expression Trees.
+
+    Each node is identified by an integer id, which is its index in the
+    parallel lists below. Structurally identical nodes (including the spelling
+    of their operators, so that they also share the same label) are only stored
+    once, so shared sub-expressions are evaluated once. Nodes are always added
+    after their operands, so iterating the ids in order visits the operands of
+    each node before the node itself.
+
+    Several trees can be added to the same arena, in which case their shared
+    sub-expressions are also only stored once.
+    """
+
+    kinds: list[NodeKind]
+    operators: list[TokenType | None]
+    "The operator type of each node, `None` for variables & groups"
+
+    lefts: list[int]
+    "The left operand of each binary node"
+
+    rights: list[int]
+    "The right operand of each unary node, binary node, or group"
+
+    labels: list[str]
+    "The text of each node, e.g. the name of a variable"
+
+    roots: list[int]
+    "The root node of each tree added to the arena"
+
+    ids: dict[Hashable, int]
+
+    def __init__(self) -> None:  # noqa: D107
+        self.kinds = []
+        self.operators = []
+        self.lefts = []
+        self.rights = []
+        self.labels = []
+        self.roots = []
+        self.ids = {}
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.kinds)
+
+    # region Construction
+
+    def add(self, tree: Expr) -> int:
+        """Add an expression tree to the arena and return the id of its root."""
+        root = self.add_expr(tree)
+        self.roots.append(root)
+        return root
+
+    def add_expr(self, expr: Expr, order: list[int] | None = None) -> int:
+        """Add the nodes of an expression in post-order and return the id of its root.
+
+        Each node is visited twice, first to schedule its children and then to
+        add the node itself once the ids of its children are known. The pending
+        nodes are kept in an explicit stack instead of recursion, so that deeply
+        nested expressions don't reach Python's recursion limit. If `order` is
+        given, the id of each node is appended to it in post-order, including
+        the nodes which already existed.
+        """
+        results: list[int] = []
+        stack: list[tuple[Expr, bool]] = [(expr, False)]
+        while stack:
+            expr, visited = stack.pop()
+            if not visited and not isinstance(expr, VariableExpr):
+                stack.append((expr, True))
+                stack.extend((child, False) for child in reversed(expr.children()))
+                continue
+
+            children = [results.pop() for _ in expr.children()][::-1]
+            results.append(self.add_node(expr, children))
+            if order is not None:
+                order.append(results[-1])
+        return results.pop()
+
+    def add_node(self, expr: Expr, children: list[int]) -> int:
+        """Map each expression's type to its corresponding node, given its children."""
+        if isinstance(expr, GroupExpr):
+            (child,) = children
+            return self.intern(("group", child), "group", None, NO_NODE, child, expr)
+        if isinstance(expr, VariableExpr):
+            key = ("variable", expr.name.value)
+            return self.intern(key, "variable", None, NO_NODE, NO_NODE, expr)
+        if isinstance(expr, UnaryExpr):
+            (right,) = children
+            operator = expr.operator
+            key = ("unary", operator.type, operator.value, right)
+            return self.intern(key, "unary", operator.type, NO_NODE, right, expr)
+        if isinstance(expr, BinaryExpr):
+            left, right = children
+            operator = expr.operator
+            key = ("binary", left, operator.type, operator.value, right)
+            return self.intern(key, "binary", operator.type, left, right, expr)
+        raise TypeError(f"Unknown expression: {expr!r}")
+
+    def intern(  # noqa: PLR0913
+        self,
+        key: Hashable,
+        kind: NodeKind,
+        operator: TokenType | None,
+        left: int,
+        right: int,
+        expr: Expr,
+    ) -> int:
+        """Get the id of an existing node with the same key, or add a new node."""
+        if key in self.ids:
+            return self.ids[key]
+
+        node = len(self.kinds)
+        self.kinds.append(kind)
+        self.operators.append(operator)
+        self.lefts.append(left)
+        self.rights.append(right)
+        self.labels.append(expr.label)
+        self.ids[key] = node
+        return node
+
+    # endregion
+
+    def resolve(self, node: int) -> int:
+        """Skip the groups wrapping a node, which have the same value as the node."""
+        while self.kinds[node] == "group":
+            node = self.rights[node]
+        return node
+
+    def find_variable(self, name: str) -> int:
+        """Get the id of a variable node, or `NO_NODE` if it does not exist."""
+        return self.ids.get(("variable", name), NO_NODE)
+
+    def variables(self) -> list[str]:
+        """Get the sorted names of the variables in the arena."""
+        names = {
+            label for kind, label in zip(self.kinds, self.labels) if kind == "variable"
+        }
+        return sorted(names)
+
+    def dependencies(self, nodes: list[int]) -> set[int]:
+        """Get the given nodes and all the nodes they depend on."""
+        needed = set(nodes)
+        for node in range(len(self.kinds) - 1, -1, -1):
+            if node in needed:
+                needed.update((self.lefts[node], self.rights[node]))
+        needed.discard(NO_NODE)
+        return needed
+
+    def columns(self) -> list[int]:
+        """Get the ids of the unary & binary nodes, the sub-expressions of a table."""
+        return [
+            node for node, kind in enumerate(self.kinds) if kind in ("unary", "binary")
+        ]
+
+
+def build_arena(tree: Expr) -> ExprArena:
+    # wrapper function for convenience
+    arena = ExprArena()
+    arena.add(tree)
+    return arena
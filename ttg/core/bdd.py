@@ -0,0 +1,440 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Iterator, Tuple
+
+from ttg.core.arena import ExprArena, build_arena
+
+if TYPE_CHECKING:
+    from ttg.core.evaluator import TruthValues
+    from ttg.core.lexer import TokenType
+    from ttg.core.parser import Expr
+
+FALSE_NODE = 0
+"The terminal node of the constant `False`"
+
+TRUE_NODE = 1
+"The terminal node of the constant `True`"
+
+operations: dict[TokenType, Callable[[bool, bool], bool]] = {
+    "and": lambda left, right: left and right,
+    "or": lambda left, right: left or right,
+    "then": lambda left, right: (not left) or right,
+    "only_if": lambda left, right: left == right,
+}
+"Truth function of each binary operator, applied to the terminal nodes"
+
+ApplyKey = Tuple["TokenType", int, int]
+
+reorder_size = 1 << 12
+"Count of nodes which triggers sifting while building a diagram, by default"
+
+
+class Bdd:
+    """Reduced Ordered Binary Decision Diagram (ROBDD) manager.
+
+    Each node tests a variable and points to a `low` node (if the variable is
+    `False`) and a `high` node (if `True`), down to the terminal nodes. The
+    variables are always tested in the same order, and the nodes are hash-consed
+    in a unique table so that no two nodes test the same variable with the same
+    children, and no node has the same `low` & `high` children. Hence, every
+    boolean function has exactly one node, so comparing two formulas is simply
+    comparing their nodes.
+
+    The size of the diagram depends heavily on the order of the variables, which
+    can be given upfront or improved by sifting, either afterwards or whenever
+    the unique table grows past `reorder_size` while building.
+    """
+
+    names: list[str]
+    "The name of each variable, indexed by the id of the variable"
+
+    ids: dict[str, int]
+
+    order: list[int]
+    "The variable tested at each level, from the root to the terminals"
+
+    levels: list[int]
+    "The level of each variable"
+
+    variables: list[int]
+    "The variable tested by each node, -1 for the terminal nodes"
+
+    lows: list[int]
+    highs: list[int]
+
+    unique: dict[tuple[int, int, int], int]
+    "The id of each node, keyed by its variable and children"
+
+    nodes: list[set[int]]
+    "The nodes testing each variable"
+
+    cache: dict[ApplyKey, int]
+    "The results of the operators applied to pairs of nodes"
+
+    reorder_size: int | None
+    "Count of nodes which triggers sifting while building, or never if `None`"
+
+    def __init__(  # noqa: D107
+        self,
+        order: list[str],
+        reorder_size: int | None = None,
+    ) -> None:
+        self.names = list(order)
+        self.ids = {name: variable for variable, name in enumerate(order)}
+        self.order = list(range(len(order)))
+        self.levels = list(range(len(order)))
+        self.variables = [-1, -1]
+        self.lows = [FALSE_NODE, TRUE_NODE]
+        self.highs = [FALSE_NODE, TRUE_NODE]
+        self.unique = {}
+        self.nodes = [set() for _ in order]
+        self.cache = {}
+        self.reorder_size = reorder_size
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.variables)
+
+    def level(self, node: int) -> int:
+        """Get the level of the variable tested by a node, below all for terminals."""
+        variable = self.variables[node]
+        return len(self.order) if variable < 0 else self.levels[variable]
+
+    # region Construction
+
+    def make(self, variable: int, low: int, high: int) -> int:
+        """Get the node testing a variable with the given children, or add it."""
+        if low == high:
+            return low
+        key = (variable, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            node = len(self.variables)
+            self.variables.append(variable)
+            self.lows.append(low)
+            self.highs.append(high)
+            self.unique[key] = node
+            self.nodes[variable].add(node)
+        return node
+
+    def variable(self, name: str) -> int:
+        """Get the node of a single variable."""
+        return self.make(self.ids[name], FALSE_NODE, TRUE_NODE)
+
+    def cofactors(self, node: int, level: int) -> tuple[int, int]:
+        """Get the `low` & `high` children of a node, if it tests the given level."""
+        if self.level(node) != level:
+            return node, node
+        return self.lows[node], self.highs[node]
+
+    def terminal(  # noqa: PLR0911
+        self,
+        operator: TokenType,
+        left: int,
+        right: int,
+    ) -> int | None:
+        """Get the result of an operator without visiting the children, if trivial."""
+        if left <= TRUE_NODE and right <= TRUE_NODE:
+            return int(operations[operator](left == TRUE_NODE, right == TRUE_NODE))
+        if operator in ("and", "or"):
+            # `False` decides an AND by itself, and `True` decides an OR
+            decisive = FALSE_NODE if operator == "and" else TRUE_NODE
+            if decisive in (left, right):
+                return decisive
+            if left == right or right == 1 - decisive:
+                return left
+            if left == 1 - decisive:
+                return right
+            return None
+        if operator == "then" and (left in (FALSE_NODE, right) or right == TRUE_NODE):
+            return TRUE_NODE
+        if operator == "only_if" and left == right:
+            return TRUE_NODE
+        return None
+
+    def apply(self, operator: TokenType, left: int, right: int) -> int:
+        """Apply a binary operator to two nodes.
+
+        Both nodes are split on the variable of the topmost level between them,
+        and the operator is applied to each pair of children. The pending pairs
+        are kept in an explicit stack instead of recursion, and the result of
+        each pair is cached so that each pair is only computed once.
+        """
+        results: list[int] = []
+        stack: list[tuple[int, int, bool]] = [(left, right, False)]
+        while stack:
+            left, right, visited = stack.pop()
+            level = min(self.level(left), self.level(right))
+            left_low, left_high = self.cofactors(left, level)
+            right_low, right_high = self.cofactors(right, level)
+
+            if visited:
+                high, low = results.pop(), results.pop()
+                node = self.make(self.order[level], low, high)
+                self.cache[operator, left, right] = node
+                results.append(node)
+                continue
+
+            node = self.terminal(operator, left, right)
+            if node is None:
+                node = self.cache.get((operator, left, right))
+            if node is not None:
+                results.append(node)
+                continue
+
+            stack.append((left, right, True))
+            stack.append((left_high, right_high, False))
+            stack.append((left_low, right_low, False))
+        return results.pop()
+
+    def negate(self, node: int) -> int:
+        """Apply the NOT operator to a node."""
+        return self.apply("only_if", node, FALSE_NODE)
+
+    def build(self, arena: ExprArena) -> list[int]:
+        """Build the nodes of every node of an arena, indexed by their ids.
+
+        If the unique table grows past `reorder_size`, the variables are sifted
+        with the nodes built so far as roots, and the size which triggers the
+        next sifting is doubled from the size after sifting. The nodes keep
+        their ids across sifting, so the nodes built so far stay valid.
+        """
+        nodes: list[int] = []
+
+        # the operands of each node come before the node itself
+        for node in range(len(arena)):
+            kind = arena.kinds[node]
+            if kind == "variable":
+                nodes.append(self.variable(arena.labels[node]))
+                continue
+
+            right = nodes[arena.rights[node]]
+            operator = arena.operators[node]
+            if kind == "group" or (kind == "unary" and operator != "not"):
+                value = right
+            elif kind == "unary":
+                value = self.negate(right)
+            elif operator in operations:
+                value = self.apply(operator, nodes[arena.lefts[node]], right)
+            else:
+                value = FALSE_NODE
+            nodes.append(value)
+
+            if self.reorder_size is not None and len(self.unique) > self.reorder_size:
+                self.reorder_size = max(self.reorder_size, self.sift(nodes) * 2)
+        return nodes
+
+    def add(self, tree: Expr) -> int:
+        """Build the node of a formula."""
+        arena = build_arena(tree)
+        return self.build(arena)[arena.roots[-1]]
+
+    # endregion
+
+    # region Queries
+
+    def count(self, node: int) -> int:
+        """Count the assignments of all the variables for which a node is `True`."""
+        counts = {FALSE_NODE: 0, TRUE_NODE: 1}
+        stack = [node]
+        while stack:
+            current = stack[-1]
+            if current in counts:
+                stack.pop()
+                continue
+            pending = [
+                child
+                for child in (self.lows[current], self.highs[current])
+                if child not in counts
+            ]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+
+            # the variables skipped between a node and its children are free
+            level = self.level(current)
+            counts[current] = sum(
+                counts[child] << (self.level(child) - level - 1)
+                for child in (self.lows[current], self.highs[current])
+            )
+        return counts[node] << self.level(node)
+
+    def iter_models(self, node: int) -> Iterator[TruthValues]:
+        """Lazily generate the assignments of the variables for which a node is `True`.
+
+        The assignments follow the order of the levels, wherein the first level
+        is the most significant and the `True` values come first, same as the
+        rows of the truth table when the variables are in their sorted order.
+        """
+        stack: list[tuple[int, int, tuple[bool, ...]]] = [(node, 0, ())]
+        while stack:
+            current, level, values = stack.pop()
+            if current == FALSE_NODE:
+                continue
+            if level == len(self.order):
+                yield {
+                    self.names[variable]: values[self.levels[variable]]
+                    for variable in sorted(self.order)
+                }
+                continue
+
+            # skipped levels are free, otherwise follow the matching child
+            low, high = self.cofactors(current, level)
+            stack.append((low, level + 1, (*values, False)))
+            stack.append((high, level + 1, (*values, True)))
+
+    def any_model(self, node: int) -> TruthValues | None:
+        """Get the first assignment for which a node is `True`, if any."""
+        return next(self.iter_models(node), None)
+
+    def size(self, roots: list[int]) -> int:
+        """Count the nodes reachable from the given nodes, including terminals."""
+        return len(self.reachable(roots))
+
+    def reachable(self, roots: list[int]) -> set[int]:
+        """Get the nodes reachable from the given nodes, including terminals."""
+        seen: set[int] = set()
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if node in seen:
+                continue
+            seen.add(node)
+            if node > TRUE_NODE:
+                stack += [self.lows[node], self.highs[node]]
+        return seen
+
+    # endregion
+
+    # region Reordering
+
+    def swap(self, level: int) -> None:
+        """Swap the variables of a level and of the level below it, in place.
+
+        Only the nodes testing the upper variable which have children testing
+        the lower variable need to change, and they keep their ids (so they
+        still represent the same functions) by testing the lower variable first
+        with new nodes of the upper variable as children.
+        """
+        upper, lower = self.order[level], self.order[level + 1]
+
+        nodes = [
+            node
+            for node in self.nodes[upper]
+            if lower
+            in (self.variables[self.lows[node]], self.variables[self.highs[node]])
+        ]
+
+        self.order[level], self.order[level + 1] = (
+            self.order[level + 1],
+            self.order[level],
+        )
+        self.levels[upper], self.levels[lower] = level + 1, level
+
+        for node in nodes:
+            low, high = self.lows[node], self.highs[node]
+            low_low, low_high = self.cofactors_of(low, lower)
+            high_low, high_high = self.cofactors_of(high, lower)
+
+            del self.unique[upper, low, high]
+            new_low = self.make(upper, low_low, high_low)
+            new_high = self.make(upper, low_high, high_high)
+            self.variables[node] = lower
+            self.lows[node] = new_low
+            self.highs[node] = new_high
+            self.unique[lower, new_low, new_high] = node
+            self.nodes[upper].remove(node)
+            self.nodes[lower].add(node)
+
+    def collect(self, roots: list[int]) -> int:
+        """Forget the nodes unreachable from the given nodes, and return the size.
+
+        The ids of the forgotten nodes are never reused, but they are removed
+        from the unique table and the apply cache, so they are never returned
+        again and the nodes from the given roots stay canonical.
+        """
+        live = self.reachable(roots)
+        for variable, nodes in enumerate(self.nodes):
+            dead = nodes - live
+            for node in dead:
+                del self.unique[variable, self.lows[node], self.highs[node]]
+            nodes.difference_update(dead)
+        self.cache.clear()
+        return len(live)
+
+    def cofactors_of(self, node: int, variable: int) -> tuple[int, int]:
+        """Get the `low` & `high` children of a node, if it tests the given variable."""
+        if self.variables[node] != variable:
+            return node, node
+        return self.lows[node], self.highs[node]
+
+    def sift(self, roots: list[int], max_growth: float = 1.2) -> int:
+        """Reorder the variables to reduce the size of the diagram, and return it.
+
+        Each variable, starting from those with the most nodes, is moved across
+        every level by swapping adjacent levels, then moved back to the level
+        with the smallest size. Moving in a direction stops early once the size
+        grows past `max_growth` times the smallest size. The nodes unreachable
+        from the given nodes are forgotten along the way.
+        """
+        best = self.collect(roots)
+        variables = sorted(self.order, key=lambda variable: -len(self.nodes[variable]))
+        for variable in variables:
+            level = self.levels[variable]
+            best_level = level
+
+            # move down to the bottom, then up to the top
+            for direction, stop in ((1, len(self.order) - 1), (-1, 0)):
+                while level != stop:
+                    self.swap(min(level, level + direction))
+                    level += direction
+                    size = self.collect(roots)
+                    if size < best:
+                        best, best_level = size, level
+                    elif size > best * max_growth:
+                        break
+
+            while level != best_level:
+                direction = 1 if best_level > level else -1
+                self.swap(min(level, level + direction))
+                level += direction
+        return self.collect(roots)
+
+    # endregion
+
+
+def build_bdd(
+    tree: Expr,
+    order: list[str] | None = None,
+    reorder: bool = True,
+) -> tuple[Bdd, int]:
+    # wrapper function for convenience, the variables start in their sorted
+    # order by default, and are sifted while building if the diagram grows large
+    arena = build_arena(tree)
+    variables = arena.variables() if order is None else order
+    bdd = Bdd(variables, reorder_size if reorder else None)
+    return bdd, bdd.build(arena)[arena.roots[-1]]
+
+
+def count_models(tree: Expr, order: list[str] | None = None) -> int:
+    # wrapper function for convenience
+    bdd, node = build_bdd(tree, order)
+    return bdd.count(node)
+
+
+def find_difference(left: Expr, right: Expr) -> TruthValues | None:
+    """Get an assignment for which two formulas differ, or `None` if equivalent.
+
+    Both formulas are built over the union of their variables, and are
+    equivalent if and only if they have the same node.
+    """
+    arena = ExprArena()
+    arena.add(left)
+    arena.add(right)
+    bdd = Bdd(arena.variables(), reorder_size)
+    nodes = bdd.build(arena)
+
+    left_node, right_node = (nodes[root] for root in arena.roots)
+    if left_node == right_node:
+        return None
+    return bdd.any_model(bdd.negate(bdd.apply("only_if", left_node, right_node)))
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ttg.core.table import PackedTruthTable
+
+magic = b"TTGT"
+"Signature at the start of every bit-packed truth table file"
+
+version = 1
+"Version of the layout of the file, incremented on incompatible changes"
+
+header_struct = struct.Struct("<4sHHIQ")
+"Fixed part of the header: magic, version, reserved, count of columns & of rows"
+
+label_struct = struct.Struct("<I")
+"Prefix of each label with the length of its UTF-8 bytes"
+
+alignment = 8
+"Byte boundary of the start & the size of each column"
+
+
+def align(size: int) -> int:
+    """Round up a size in bytes to the next multiple of `alignment`."""
+    return (size + alignment - 1) // alignment * alignment
+
+
+def column_stride(rows: int) -> int:
+    """Get the size in bytes of each column, including its padding."""
+    return align((rows + 7) // 8)
+
+
+@dataclass
+class BinaryHeader:
+    """The header of a bit-packed truth table file.
+
+    The file stores its integers in little-endian, and is laid out as follows:
+
+    - `magic` (4 bytes), `version` (2 bytes) & a reserved field (2 bytes)
+    - count of columns (4 bytes) & count of rows (8 bytes)
+    - for each column, the length of its label (4 bytes) then its UTF-8 bytes
+    - zero padding up to the next multiple of 8 bytes
+    - the columns in order (column-major), each using `column_stride` bytes
+
+    Same as `PackedColumn`, the n-th row of a column is stored in the (n % 8)-th
+    bit of its (n // 8)-th byte. Since every column starts on an 8-byte
+    boundary, the file can be memory-mapped and each column read in place.
+    """
+
+    labels: list[str]
+    rows: int
+
+    offset: int
+    "Position of the first column in the file"
+
+    @property
+    def stride(self) -> int:
+        """Size in bytes of each column, including its padding."""
+        return column_stride(self.rows)
+
+    @property
+    def size(self) -> int:
+        """Size in bytes of the entire file."""
+        return self.offset + self.stride * len(self.labels)
+
+    def column_offset(self, index: int) -> int:
+        """Get the position of the index-th column in the file."""
+        return self.offset + self.stride * index
+
+
+def encode_header(labels: list[str], rows: int) -> bytes:
+    """Encode the header of a file for the given columns & count of rows."""
+    parts = [header_struct.pack(magic, version, 0, len(labels), rows)]
+    for label in labels:
+        data = label.encode()
+        parts.extend([label_struct.pack(len(data)), data])
+
+    header = b"".join(parts)
+    return header.ljust(align(len(header)), b"\0")
+
+
+def decode_header(buffer: bytes | memoryview) -> BinaryHeader:
+    """Decode the header at the start of a file, or raise `ValueError` if invalid."""
+    if bytes(buffer[: len(magic)]) != magic:
+        raise ValueError("Not a truth table file")
+    if len(buffer) < header_struct.size:
+        raise ValueError("Truncated truth table file")
+    _, file_version, _, count, rows = header_struct.unpack_from(buffer)
+    if file_version != version:
+        raise ValueError(f"Unsupported truth table file version: {file_version}")
+
+    labels: list[str] = []
+    position = header_struct.size
+    for _ in range(count):
+        (length,) = label_struct.unpack_from(buffer, position)
+        position += label_struct.size
+        labels.append(bytes(buffer[position : position + length]).decode())
+        position += length
+
+    header = BinaryHeader(labels, rows, align(position))
+    if len(buffer) < header.size:
+        raise ValueError("Truncated truth table file")
+    return header
+
+
+def write_binary(table: PackedTruthTable, file: IO[bytes]) -> None:
+    """Write a bit-packed truth table file, see `BinaryHeader` for its layout."""
+    file.write(encode_header(list(table.columns), table.rows))
+    stride = column_stride(table.rows)
+    for column in table.columns.values():
+        file.write(column.data)
+        file.write(b"\0" * (stride - len(column.data)))
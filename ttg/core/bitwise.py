@@ -0,0 +1,494 @@
+from __future__ import annotations
+
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import TYPE_CHECKING, Collection, Dict, List, Sequence, Tuple
+
+from ttg.core.arena import NO_NODE, ExprArena, build_arena
+from ttg.core.binary import column_stride, encode_header
+from ttg.core.evaluator import TruthTable, formula_variables
+from ttg.core.table import PackedColumn, PackedTruthTable
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from ttg.core.lexer import Token
+    from ttg.core.parser import Expr
+
+TruthColumns = Dict[str, int]
+"""
+The Truth Columns type stores a bitmask for each expression. The n-th bit of a
+bitmask holds the value of the expression in the n-th row of the truth table,
+which allows evaluating all the rows at once using bitwise operations.
+"""
+
+window_bits = 20
+"Count of the last variables whose rows are evaluated at once into a file"
+
+max_extra_variables = 1
+"Most variables which a formula evaluated with others may not use itself"
+
+min_parallel_variables = 24
+"""
+Minimum count of variables before the rows are split across several processes,
+below which starting the processes takes longer than evaluating every row
+"""
+
+WindowInputs = Tuple[ExprArena, List[str], List[int]]
+"The arena, the variables & the output nodes of a formula evaluated in windows"
+
+window_inputs: WindowInputs | None = None
+"The inputs of the windows evaluated by a worker process of `evaluate_parallel`"
+
+
+def variable_column(index: int, count: int) -> int:
+    """Generate the bitmask of the `index`-th variable out of `count` variables.
+
+    The rows follow the same order as `truth_table_variables`, wherein the first
+    variable is the most significant and the `True` values come first.
+    """
+    # The values of a variable alternate between runs of `True` and `False` of
+    # equal length, and the first variable has the longest runs. Starting from a
+    # single run of `True` values, the pattern is repeatedly doubled until it
+    # covers all the rows.
+    run = 1 << (count - 1 - index)
+    column = (1 << run) - 1
+    width, rows = run * 2, 1 << count
+    while width < rows:
+        column |= column << width
+        width *= 2
+    return column
+
+
+def variable_window(index: int, count: int, start: int, bits: int) -> int:
+    """Generate the bitmask of a variable over only `2^bits` rows of the table.
+
+    The rows start from the `start`-th row, which must be a multiple of
+    `2^bits`. Within such a window, the first `count - bits` variables keep the
+    same value, while the last `bits` variables follow the same pattern as
+    a truth table of only those variables.
+    """
+    shift = count - 1 - index
+    if shift < bits:
+        return variable_column(index - (count - bits), bits)
+    return 0 if start >> shift & 1 else (1 << (1 << bits)) - 1
+
+
+def output_nodes(
+    arena: ExprArena,
+    variables: list[str],
+    columns: Collection[str] | None = None,
+) -> list[int]:
+    """Get the nodes of the columns of the truth table, or only the selected ones."""
+    nodes = [arena.find_variable(variable) for variable in variables]
+    nodes += arena.columns()
+    if columns is not None:
+        nodes = [node for node in nodes if arena.labels[node] in columns]
+    return nodes
+
+
+class BitwiseEvaluator:
+    """Column-wise interpreter for the Syntax Tree of a Formula.
+
+    Unlike `Evaluator`, which traverses the Expression Tree once for every row
+    of the truth table, this interpreter visits each node of the arena of the
+    Expression Tree only once and evaluates it for all the rows at the same
+    time. Every value is a bitmask of the entire column, so the logical
+    operators become bitwise operators.
+    """
+
+    arena: ExprArena
+    values: list[int]
+    "The bitmask of each node"
+
+    inputs: TruthColumns
+    "The bitmask of each variable"
+
+    mask: int
+    "Bitmask with all the rows set to `True`"
+
+    def eval(self, node: int) -> int:
+        """Map each node's kind to its corresponding evaluator function."""
+        kind = self.arena.kinds[node]
+        if kind == "group":
+            return self.values[self.arena.rights[node]]
+        if kind == "variable":
+            return self.eval_variable(node)
+        if kind == "unary":
+            return self.eval_unary(node)
+        return self.eval_binary(node)
+
+    def eval_variable(self, node: int) -> int:  # noqa: D102
+        return self.inputs.get(self.arena.labels[node], 0)
+
+    def eval_unary(self, node: int) -> int:  # noqa: D102
+        value = self.values[self.arena.rights[node]]
+        if self.arena.operators[node] == "not":
+            value ^= self.mask
+        return value
+
+    def eval_binary(self, node: int) -> int:  # noqa: D102
+        left = self.values[self.arena.lefts[node]]
+        right = self.values[self.arena.rights[node]]
+        operator = self.arena.operators[node]
+        value = 0
+        if operator == "and":
+            value = left & right
+        if operator == "or":
+            value = left | right
+        if operator == "then":
+            value = (left ^ self.mask) | right
+        if operator == "only_if":
+            value = (left ^ right) ^ self.mask
+        return value
+
+    def evaluate_arena(
+        self,
+        arena: ExprArena,
+        variables: list[str],
+        keep: Collection[int] | None = None,
+        start: int = 0,
+        bits: int | None = None,
+    ) -> list[int]:
+        """Evaluate every node of the arena as bitmasks, indexed by their ids.
+
+        If `keep` is given, the bitmasks of the other nodes are released (set to
+        0) as soon as the last node using them is evaluated, so that only the
+        bitmasks still needed are held in memory at any time. If `bits` is
+        given, only the `2^bits` rows from the `start`-th row are evaluated.
+        """
+        count = len(variables)
+        bits = count if bits is None else bits
+        self.arena = arena
+        self.mask = (1 << (1 << bits)) - 1
+        self.inputs = {
+            variable: variable_window(index, count, start, bits)
+            for index, variable in enumerate(variables)
+        }
+
+        last_uses: dict[int, int] = {}
+        for node in range(len(arena)):
+            last_uses[arena.lefts[node]] = node
+            last_uses[arena.rights[node]] = node
+
+        # the operands of each node come before the node itself
+        self.values = []
+        for node in range(len(arena)):
+            self.values.append(self.eval(node))
+            if keep is None:
+                continue
+            for operand in (arena.lefts[node], arena.rights[node]):
+                released = operand != NO_NODE and operand not in keep
+                if released and last_uses[operand] == node:
+                    self.values[operand] = 0
+        return self.values
+
+    def evaluate(
+        self,
+        tree: Expr,
+        variables: list[str],
+        columns: Collection[str] | None = None,
+    ) -> TruthColumns:
+        """Evaluate & Store the sub-expressions of a formula as bitmasks.
+
+        Given the root node of an expression tree and all the variables in the
+        expression tree, it returns the bitmasks of the variables and of the
+        results of the sub-expressions of the propositional logic formula, or
+        only those among `columns` if given.
+        """
+        arena = build_arena(tree)
+        nodes = output_nodes(arena, variables, columns)
+        keep = None if columns is None else set(nodes)
+        values = self.evaluate_arena(arena, variables, keep)
+        return {arena.labels[node]: values[node] for node in nodes}
+
+
+def evaluate_packed(
+    tokens: list[Token],
+    tree: Expr,
+    columns: Collection[str] | None = None,
+) -> PackedTruthTable:
+    # wrapper function for convenience, computes the truth table column by
+    # column instead of row by row and keeps the columns bit-packed
+
+    variables = formula_variables(tokens)
+    bitmasks = BitwiseEvaluator().evaluate(tree, variables, columns)
+
+    rows = 1 << len(variables)
+    packed = {
+        key: PackedColumn.from_int(column, rows) for key, column in bitmasks.items()
+    }
+    return PackedTruthTable(packed, rows)
+
+
+def project_column(column: int, variables: list[str], kept: list[str]) -> int:
+    """Keep only the rows of a bitmask wherein the other variables are `True`.
+
+    The rows of a truth table over `variables` become the rows of a truth table
+    over only the `kept` variables, as long as the kept variables keep their
+    order.
+    """
+    digits = format(column, f"0{1 << len(variables)}b").encode()[::-1]
+
+    # Removing the most significant variables first keeps the positions of the
+    # runs of the next variables, wherein the `True` runs come first
+    for index, variable in enumerate(variables):
+        if variable in kept:
+            continue
+        run = 1 << (len(variables) - 1 - index)
+        if run == 1:
+            digits = digits[::2]
+        else:
+            runs = range(0, len(digits), run * 2)
+            digits = b"".join(digits[x : x + run] for x in runs)
+    return int(digits[::-1], 2)
+
+
+def group_trees(trees: Sequence[Expr]) -> list[list[int]]:
+    """Group the formulas which share most of their variables, by their indices.
+
+    A formula joins the first group whose union of variables stays within
+    `max_extra_variables` of the variables of each formula of the group, so no
+    formula is evaluated over more than `2^max_extra_variables` times its own
+    rows. Formulas with disjoint variables always end up in separate groups.
+    """
+    groups: list[tuple[set[str], int, list[int]]] = []
+    for index, tree in enumerate(trees):
+        variables = set(build_arena(tree).variables())
+        for position, (union, fewest, members) in enumerate(groups):
+            merged, least = union | variables, min(fewest, len(variables))
+            if len(merged) - least <= max_extra_variables:
+                groups[position] = (merged, least, [*members, index])
+                break
+        else:
+            groups.append((variables, len(variables), [index]))
+    return [members for _, _, members in groups]
+
+
+def evaluate_group(
+    trees: Sequence[Expr],
+    columns: Collection[str] | None = None,
+) -> list[PackedTruthTable]:
+    """Evaluate several formulas in a single arena over the union of their variables.
+
+    Each formula gets back its own columns, with only the rows wherein the
+    variables it doesn't use are `True`, which are the same rows as its own
+    truth table.
+    """
+    arena = ExprArena()
+    visits: list[list[int]] = []
+    for tree in trees:
+        visited: list[int] = []
+        arena.roots.append(arena.add_expr(tree, visited))
+        visits.append(list(dict.fromkeys(visited)))
+
+    outputs: list[tuple[list[str], list[int]]] = []
+    for visited in visits:
+        variables = sorted(
+            arena.labels[x] for x in visited if arena.kinds[x] == "variable"
+        )
+        nodes = [arena.find_variable(variable) for variable in variables]
+        nodes += [x for x in visited if arena.kinds[x] in ("unary", "binary")]
+        if columns is not None:
+            nodes = [x for x in nodes if arena.labels[x] in columns]
+        outputs.append((variables, nodes))
+
+    union = arena.variables()
+    keep = {node for _, nodes in outputs for node in nodes}
+    values = BitwiseEvaluator().evaluate_arena(arena, union, keep)
+
+    tables: list[PackedTruthTable] = []
+    for variables, nodes in outputs:
+        rows = 1 << len(variables)
+        packed: dict[str, PackedColumn] = {}
+        for node in nodes:
+            column = values[node]
+            if len(variables) < len(union):
+                column = project_column(column, union, variables)
+            packed[arena.labels[node]] = PackedColumn.from_int(column, rows)
+        tables.append(PackedTruthTable(packed, rows))
+    return tables
+
+
+def evaluate_many(
+    trees: Sequence[Expr],
+    columns: Collection[str] | None = None,
+) -> list[PackedTruthTable]:
+    """Evaluate several formulas at once, sharing their common sub-expressions.
+
+    The formulas sharing most of their variables (see `group_trees`) are merged
+    into a single arena, so each distinct sub-expression is evaluated once for
+    all the formulas of the group. Each formula gets back the same truth table
+    as evaluating it on its own, with only its own variables & sub-expressions
+    (or only `columns` if given), in the same order as the trees.
+    """
+    tables: dict[int, PackedTruthTable] = {}
+    for group in group_trees(trees):
+        grouped = evaluate_group([trees[index] for index in group], columns)
+        tables.update(zip(group, grouped))
+    return [tables[index] for index in range(len(trees))]
+
+
+def evaluate_window(
+    arena: ExprArena,
+    variables: list[str],
+    nodes: list[int],
+    start: int,
+    bits: int,
+) -> list[bytes]:
+    """Evaluate `2^bits` rows from the `start`-th row, for use in a separate process.
+
+    The columns of the nodes are returned bit-packed, in the same layout as the
+    bytes of a `PackedColumn`, so they're cheap to send back and to join.
+    """
+    evaluator, keep = BitwiseEvaluator(), set(nodes)
+    values = evaluator.evaluate_arena(arena, variables, keep, start, bits)
+    size = ((1 << bits) + 7) // 8
+    return [values[node].to_bytes(size, "little") for node in nodes]
+
+
+def init_window_worker(
+    arena: ExprArena,
+    variables: list[str],
+    nodes: list[int],
+) -> None:
+    """Store the inputs of the windows once in each worker process.
+
+    Otherwise the entire arena would be pickled again along with every window.
+    """
+    global window_inputs  # noqa: PLW0603
+    window_inputs = (arena, variables, nodes)
+
+
+def evaluate_worker_window(start: int, bits: int) -> list[bytes]:
+    """Evaluate a window of rows of the formula stored by `init_window_worker`."""
+    if window_inputs is None:
+        raise RuntimeError("Worker process isn't initialized")
+    return evaluate_window(*window_inputs, start, bits)
+
+
+def evaluate_parallel(
+    tokens: list[Token],
+    tree: Expr,
+    workers: int,
+    columns: Collection[str] | None = None,
+    min_variables: int = min_parallel_variables,
+) -> PackedTruthTable:
+    # wrapper function for convenience, same as `evaluate_packed` but splits the
+    # rows into windows evaluated across several processes, unless the formula
+    # has fewer than `min_variables` variables
+
+    variables = formula_variables(tokens)
+    count = len(variables)
+    if workers <= 1 or count < min_variables:
+        return evaluate_packed(tokens, tree, columns)
+
+    arena = build_arena(tree)
+    nodes = output_nodes(arena, variables, columns)
+
+    # Split the rows into several windows per worker (to even out the workload),
+    # then copy the bytes of each window into its offset in the columns, which
+    # starts on a byte since windows have at least 8 rows (except small tables)
+    rows = 1 << count
+    bits = max(count - (workers * 4 - 1).bit_length(), min(count, 3))
+    buffers = [bytearray((rows + 7) // 8) for _ in nodes]
+    starts = range(0, rows, 1 << bits)
+    with ProcessPoolExecutor(
+        workers,
+        initializer=init_window_worker,
+        initargs=(arena, variables, nodes),
+    ) as executor:
+        windows = executor.map(evaluate_worker_window, starts, repeat(bits))
+        for start, window in zip(starts, windows):
+            offset = start // 8
+            for buffer, data in zip(buffers, window):
+                buffer[offset : offset + len(data)] = data
+
+    packed = {
+        arena.labels[node]: PackedColumn(bytes(buffer), rows)
+        for node, buffer in zip(nodes, buffers)
+    }
+    return PackedTruthTable(packed, rows)
+
+
+def evaluate_range(
+    tokens: list[Token],
+    tree: Expr,
+    start: int,
+    stop: int,
+    columns: Collection[str] | None = None,
+) -> PackedTruthTable:
+    # wrapper function for convenience, computes only the rows from the
+    # start-th row to the stop-th row of the truth table
+
+    variables = formula_variables(tokens)
+    arena = build_arena(tree)
+    nodes = output_nodes(arena, variables, columns)
+    start, stop = max(start, 0), min(stop, 1 << len(variables))
+    stop = max(start, stop)
+
+    # Split the range into the largest windows of `2^bits` rows which start on
+    # a multiple of `2^bits`, so that only the rows of the range are evaluated,
+    # then join their bitmasks
+    evaluator, keep = BitwiseEvaluator(), set(nodes)
+    bitmasks = [0] * len(nodes)
+    position = start
+    while position < stop:
+        bits = (position & -position).bit_length() - 1 if position else len(variables)
+        while position + (1 << bits) > stop:
+            bits -= 1
+        values = evaluator.evaluate_arena(arena, variables, keep, position, bits)
+        for i, node in enumerate(nodes):
+            bitmasks[i] |= values[node] << (position - start)
+        position += 1 << bits
+
+    packed = {
+        arena.labels[node]: PackedColumn.from_int(bitmask, stop - start)
+        for node, bitmask in zip(nodes, bitmasks)
+    }
+    return PackedTruthTable(packed, stop - start)
+
+
+def evaluate_to_file(
+    tokens: list[Token],
+    tree: Expr,
+    path: Path,
+    columns: Collection[str] | None = None,
+) -> None:
+    # wrapper function for convenience, writes the truth table into a file
+    # (see `BinaryHeader` for its layout) without holding it in memory
+
+    variables = formula_variables(tokens)
+    arena = build_arena(tree)
+    nodes = output_nodes(arena, variables, columns)
+
+    count = len(variables)
+    rows = 1 << count
+    header = encode_header([arena.labels[node] for node in nodes], rows)
+    stride = column_stride(rows)
+    size = len(header) + stride * len(nodes)
+
+    # evaluate `2^bits` rows at a time, then copy each of their columns into
+    # the memory-mapped file at the offset of the first row of the window (which
+    # starts on a byte since windows have at least 8 rows, except small tables)
+    bits = min(count, max(window_bits, 3))
+    window_bytes = ((1 << bits) + 7) // 8
+    evaluator, keep = BitwiseEvaluator(), set(nodes)
+    with path.open("w+b") as file:
+        file.truncate(size)
+        with mmap.mmap(file.fileno(), size) as buffer:
+            buffer[: len(header)] = header
+            for start in range(0, rows, 1 << bits):
+                values = evaluator.evaluate_arena(arena, variables, keep, start, bits)
+                offset = len(header) + start // 8
+                for node in nodes:
+                    data = values[node].to_bytes(window_bytes, "little")
+                    buffer[offset : offset + window_bytes] = data
+                    offset += stride
+
+
+def evaluate_bitwise(tokens: list[Token], tree: Expr) -> TruthTable:
+    # wrapper function for convenience, returns the same truth table as
+    # `evaluate` but computes it column by column instead of row by row
+    return evaluate_packed(tokens, tree).to_dict()
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import hashlib
+import pickle
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Hashable, Tuple
+
+from ttg.core.evaluator import formula_variables
+from ttg.core.parser import BinaryExpr, Expr, UnaryExpr, parse
+from ttg.core.table import PackedTruthTable, TruthTableLike
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from ttg.core.lexer import Token
+
+CacheKey = Tuple[Hashable, ...]
+"""
+The Cache Key type is the canonical token stream of a formula. Operators only
+keep their types, so formulas which only differ in whitespace and in the
+spelling or case of their operators share the same key. Variables keep their
+names since they are case-sensitive.
+"""
+
+token_size = 64
+"Rough estimate of the memory used by each token & node of a formula in bytes"
+
+
+def cache_key(tokens: list[Token]) -> CacheKey:
+    """Get the canonical token stream of a formula."""
+    return tuple(
+        token.value if token.type == "variable" else token.type for token in tokens
+    )
+
+
+@dataclass
+class CacheEntry:
+    """The parsed tree and the computed truth table of a cached formula."""
+
+    tokens: list[Token]
+    tree: Expr
+    table: PackedTruthTable
+
+    nbytes: int
+    "Estimated size of the entry in bytes"
+
+
+class FormulaCache:
+    """Bounded LRU cache of parsed & evaluated formulas.
+
+    The entries are keyed by the canonical token stream of their formulas, and
+    the least recently used entries are evicted once either the count or the
+    estimated total size of the entries exceeds its limit. A formula spelled
+    differently from its cached entry (e.g. `P AND Q` for `P & Q`) is parsed
+    again for its labels, but reuses the cached columns of the truth table.
+
+    If a directory is given, the entries are also persisted into it, so that
+    they can be reused by later runs of the program.
+    """
+
+    max_entries: int
+    max_bytes: int
+    directory: Path | None
+
+    entries: OrderedDict[CacheKey, CacheEntry]
+    nbytes: int
+    "Estimated total size of the entries in bytes"
+
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(  # noqa: D107
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 << 20,
+        directory: Path | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.entries)
+
+    def contains(self, tokens: list[Token]) -> bool:
+        """Check if a formula is cached in memory, without counting a hit or miss."""
+        return cache_key(tokens) in self.entries
+
+    def get(self, tokens: list[Token]) -> CacheEntry | None:
+        """Get the entry of a formula spelled with the given tokens, if cached."""
+        key = cache_key(tokens)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.load(key)
+            if entry is not None:
+                self.insert(key, entry)
+        else:
+            self.entries.move_to_end(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if [token.value for token in tokens] != [t.value for t in entry.tokens]:
+            entry = relabel(entry, tokens)
+        return entry
+
+    def put(self, tokens: list[Token], tree: Expr, table: TruthTableLike) -> CacheEntry:
+        """Store the tree and the truth table of a formula."""
+        if not isinstance(table, PackedTruthTable):
+            table = PackedTruthTable.from_table(table)
+
+        key = cache_key(tokens)
+        nbytes = table.nbytes + token_size * len(tokens)
+        entry = CacheEntry(list(tokens), tree, table, nbytes)
+        self.insert(key, entry)
+        self.save(key, entry)
+        return entry
+
+    def insert(self, key: CacheKey, entry: CacheEntry) -> None:
+        """Add an entry then evict the least recently used entries over the limits."""
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.nbytes -= previous.nbytes
+
+        self.entries[key] = entry
+        self.nbytes += entry.nbytes
+        while len(self.entries) > 1 and (
+            len(self.entries) > self.max_entries or self.nbytes > self.max_bytes
+        ):
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all the entries in memory, but not the persisted entries."""
+        self.entries.clear()
+        self.nbytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Get the counters of the cache."""
+        return {
+            "entries": len(self.entries),
+            "bytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    # region Persistence
+
+    def path(self, key: CacheKey) -> Path | None:
+        """Get the file of a persisted entry, if persistence is enabled."""
+        if self.directory is None:
+            return None
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return self.directory / f"{digest}.pickle"
+
+    def save(self, key: CacheKey, entry: CacheEntry) -> None:
+        """Persist the tokens & the truth table of an entry.
+
+        The tree is not persisted since pickling it is recursive, and is instead
+        parsed again from the tokens when loaded.
+        """
+        path = self.path(key)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = (key, entry.tokens, entry.table.rows, dict(entry.table.columns))
+        path.write_bytes(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def load(self, key: CacheKey) -> CacheEntry | None:
+        """Load a persisted entry, if it exists."""
+        path = self.path(key)
+        if path is None or not path.is_file():
+            return None
+
+        try:
+            stored_key, tokens, rows, columns = pickle.loads(path.read_bytes())  # noqa: S301
+        except Exception:
+            return None  # skip corrupted or outdated entries
+        if stored_key != key:
+            return None
+
+        table = PackedTruthTable(columns, rows)
+        nbytes = table.nbytes + token_size * len(tokens)
+        return CacheEntry(tokens, parse(tokens), table, nbytes)
+
+    # endregion
+
+
+def relabel(entry: CacheEntry, tokens: list[Token]) -> CacheEntry:
+    """Rename the columns of a cached entry for a differently spelled formula.
+
+    Both formulas have the same canonical token stream, so their trees have the
+    same shape and the corresponding sub-expressions have the same values.
+    """
+    tree = parse(tokens)
+
+    # the variables come first and keep their names
+    columns = {
+        variable: entry.table.columns[variable]
+        for variable in formula_variables(tokens)
+    }
+
+    # walk both trees in post-order, same as the order of the labels
+    stack: list[tuple[Expr, Expr, bool]] = [(entry.tree, tree, False)]
+    while stack:
+        old, new, visited = stack.pop()
+        if not visited:
+            stack.append((old, new, True))
+            pairs = zip(reversed(old.children()), reversed(new.children()))
+            stack.extend(
+                (old_child, new_child, False) for old_child, new_child in pairs
+            )
+            continue
+        if isinstance(old, (UnaryExpr, BinaryExpr)):
+            columns.setdefault(new.label, entry.table.columns[old.label])
+
+    table = PackedTruthTable(columns, entry.table.rows)
+    return CacheEntry(list(tokens), tree, table, entry.nbytes)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Collection, Sequence, Tuple
+
+from ttg.core.arena import ExprArena, build_arena
+
+if TYPE_CHECKING:
+    from ttg.core.lexer import TokenType
+    from ttg.core.parser import Expr
+
+CompiledFunction = Callable[[Sequence[bool]], Tuple[bool, ...]]
+"""
+The Compiled Function type takes the truth values of the variables (in the
+order of `CompiledExpr.variables`) and returns the results of the
+sub-expressions (in the order of `CompiledExpr.labels`).
+"""
+
+operator_templates: dict[TokenType, str] = {
+    "and": "{left} and {right}",
+    "or": "{left} or {right}",
+    "then": "not {left} or {right}",
+    "only_if": "{left} == {right}",
+}
+"Python source templates for each binary operator"
+
+
+class CompiledExpr:
+    """A formula compiled into a specialized Python function.
+
+    Calling it with a row of truth values for the variables returns the results
+    of all the sub-expressions of the formula for that row.
+    """
+
+    variables: list[str]
+    "The order of the truth values of the variables in a row"
+
+    labels: list[str]
+    "The order of the results of the sub-expressions"
+
+    source: str
+    "The generated Python source of the function"
+
+    function: CompiledFunction
+
+    def __init__(  # noqa: D107
+        self,
+        variables: list[str],
+        labels: list[str],
+        source: str,
+        function: CompiledFunction,
+    ) -> None:
+        self.variables = variables
+        self.labels = labels
+        self.source = source
+        self.function = function
+
+    def __call__(self, row: Sequence[bool]) -> tuple[bool, ...]:  # noqa: D102
+        return self.function(row)
+
+
+class Compiler:
+    """Code generator for the Syntax Tree of a Formula.
+
+    Visits each node of the arena of the Expression Tree only once and emits a
+    Python statement for each sub-expression into the body of a single
+    function, so evaluating a row no longer needs to dispatch on the types of
+    the nodes & operators. Shared sub-expressions are hash-consed into a
+    single node by the arena, so each of them is only emitted once.
+    """
+
+    arena: ExprArena
+    lines: list[str]
+    refs: list[str]
+    "The Python expression holding the result of each node"
+
+    names: dict[str, str]
+    "The local variable name of each variable"
+
+    def emit(self, node: int) -> str:
+        """Map each node's kind to its corresponding emitter function."""
+        kind = self.arena.kinds[node]
+        if kind == "group":
+            return self.refs[self.arena.rights[node]]
+        if kind == "variable":
+            return self.emit_variable(node)
+        if kind == "unary":
+            return self.emit_unary(node)
+        return self.emit_binary(node)
+
+    def emit_variable(self, node: int) -> str:  # noqa: D102
+        return self.names.get(self.arena.labels[node], "False")
+
+    def emit_unary(self, node: int) -> str:  # noqa: D102
+        right = self.refs[self.arena.rights[node]]
+        code = f"not {right}" if self.arena.operators[node] == "not" else right
+        return self.store(node, code)
+
+    def emit_binary(self, node: int) -> str:  # noqa: D102
+        left = self.refs[self.arena.lefts[node]]
+        right = self.refs[self.arena.rights[node]]
+        operator = self.arena.operators[node]
+        template = operator_templates.get(operator, "False") if operator else "False"
+        return self.store(node, template.format(left=left, right=right))
+
+    def store(self, node: int, code: str) -> str:
+        """Emit a statement saving the result of a sub-expression."""
+        name = f"t{node}"
+        self.lines.append(f"    {name} = {code}")
+        return name
+
+    def compile(
+        self,
+        arena: ExprArena,
+        variables: list[str],
+        outputs: list[int] | None = None,
+    ) -> CompiledExpr:
+        """Compile the arena into a function over the given variables.
+
+        The function returns the results of the given nodes, which are the
+        sub-expressions of the arena by default. Only the nodes needed by those
+        results are emitted.
+        """
+        if outputs is None:
+            outputs = arena.columns()
+
+        self.arena = arena
+        self.names = {variable: f"v{i}" for i, variable in enumerate(variables)}
+        self.refs = []
+        self.lines = ["def compiled(row):"]
+        if variables:
+            self.lines.append(f"    {', '.join(self.names.values())}, = row")
+
+        # the operands of each node come before the node itself
+        needed = arena.dependencies(outputs)
+        for node in range(len(arena)):
+            self.refs.append(self.emit(node) if node in needed else "")
+
+        results = "".join(f"{self.refs[node]}, " for node in outputs)
+        self.lines.append(f"    return ({results})")
+
+        source = "\n".join(self.lines)
+        namespace: dict[str, CompiledFunction] = {}
+        exec(compile(source, "<ttg.compiled>", "exec"), namespace)  # noqa: S102
+        labels = [arena.labels[node] for node in outputs]
+        return CompiledExpr(variables, labels, source, namespace["compiled"])
+
+
+def compile_expr(tree: Expr, variables: list[str]) -> CompiledExpr:
+    # wrapper function for convenience
+    return Compiler().compile(build_arena(tree), variables)
+
+
+def compile_columns(
+    tree: Expr,
+    variables: list[str],
+    columns: Collection[str] | None = None,
+) -> CompiledExpr:
+    # wrapper function for convenience, the compiled function returns the values
+    # of the variables followed by the results of the sub-expressions, or only
+    # those among `columns` if given
+    arena = build_arena(tree)
+    outputs = [arena.find_variable(variable) for variable in variables]
+    outputs += arena.columns()
+    if columns is not None:
+        outputs = [node for node in outputs if arena.labels[node] in columns]
+    return Compiler().compile(arena, variables, outputs)
+
+
+def compile_predicate(tree: Expr, variables: list[str]) -> CompiledExpr:
+    # wrapper function for convenience, the compiled function only returns the
+    # result of the entire formula
+    arena = build_arena(tree)
+    return Compiler().compile(arena, variables, arena.roots)
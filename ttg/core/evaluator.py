@@ -1,7 +1,13 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Dict, List
+from itertools import islice, product
+from typing import TYPE_CHECKING, Collection, Dict, Iterable, Iterator, List
 
+from ttg.core.arena import build_arena
+from ttg.core.compiler import (
+    compile_columns,
+    compile_predicate,
+)
 from ttg.core.parser import BinaryExpr, Expr, GroupExpr, UnaryExpr, VariableExpr
 
 if TYPE_CHECKING:
@@ -21,69 +27,145 @@ the outputs of the sub-expressions of the input formula under a single set of
 truth values for all the variables.
 """
 
+column_groups = ("vars", "final")
+"Names for selecting the columns of all the variables, or of the entire formula"
 
-def truth_table_variables(variables: list[str]) -> list[TruthValues]:
-    """Generate all truth value combinations for all the given variables.
 
-    For convenience, instead of returning `TruthTable`, it returns a list of
-    `TruthValues` which can be used directly in the Evaluator.
+def formula_variables(tokens: list[Token]) -> list[str]:
+    """Get the sorted & unique variable names from a list of tokens."""
+    variables = list({x.value for x in filter(lambda x: x.type == "variable", tokens)})
+    variables.sort()
+    return variables
+
+
+def iter_truth_table_variables(variables: list[str]) -> Iterator[TruthValues]:
+    """Lazily generate all truth value combinations for all the given variables.
+
+    Same as `truth_table_variables` but yields each `TruthValues` one at a time
+    instead of building the entire list beforehand.
     """
-    products: list[TruthValues] = []
+    # The cartesian product of `True` & `False` for each variable is equivalent
+    # to counting from 0 to 2^n - 1 in binary, except that `True` comes first so
+    # that they appear first at the top in the table, and the first variable
+    # changes the least so that its `True` and `False` are grouped together.
+    for row in product((True, False), repeat=len(variables)):
+        yield dict(zip(variables, row))
 
-    # Iterate all numbers from 0 to 2^n - 1 then use the individual bits in their
-    # binary representation as the True & False values.
+
+def row_to_values(index: int, variables: list[str]) -> TruthValues:
+    """Get the truth values of the variables in the index-th row of the truth table.
+
+    Same as the order of `iter_truth_table_variables`, the index is counted in
+    binary wherein the first variable is the most significant bit, except that
+    a `0` bit is `True` so that the `True` values come first.
+    """
     count = len(variables)
-    for binary in range(2**count):
-        # The "not" below is solely for display purposes to generate the `True`
-        # values first so that they appear first at the top in the table
-        #
-        # The reverse iteration of "bit" below is also solely for display
-        # purposes to group `True` and `False` together for the first variable
-        #
-        # The original algorithm would be:
-        # [binary >> bit & 1 for bit in range(count)]  # noqa: ERA001
+    return {
+        variable: not index >> (count - 1 - i) & 1
+        for i, variable in enumerate(variables)
+    }
 
-        row = [not binary >> bit & 1 for bit in reversed(range(count))]
-        product = dict(zip(variables, row))
-        products.append(product)
 
-    return products
+def values_to_row(values: TruthValues, variables: list[str]) -> int:
+    """Get the index of the row of the truth values of the variables in the table."""
+    index = 0
+    for variable in variables:
+        index = index << 1 | (not values[variable])
+    return index
+
+
+def iter_rows(count: int, window: range | None = None) -> Iterator[tuple[bool, ...]]:
+    """Lazily generate the values of `count` variables in each row of the window."""
+    if window is None:
+        return product((True, False), repeat=count)
+    shifts = range(count - 1, -1, -1)
+    return (tuple(not i >> shift & 1 for shift in shifts) for i in window)
+
+
+def final_label(tree: Expr) -> str:
+    """Get the label of the column of the entire formula, without its outer groups."""
+    arena = build_arena(tree)
+    return arena.labels[arena.resolve(arena.roots[-1])]
+
+
+def select_columns(
+    tree: Expr,
+    variables: list[str],
+    selection: Iterable[str],
+) -> set[str]:
+    """Resolve the names in `column_groups` and the labels into the selected columns."""
+    columns: set[str] = set()
+    for name in selection:
+        if name == "vars":
+            columns.update(variables)
+        elif name == "final":
+            columns.add(final_label(tree))
+        else:
+            columns.add(name)
+    return columns
+
+
+def truth_table_variables(variables: list[str]) -> list[TruthValues]:
+    """Generate all truth value combinations for all the given variables.
+
+    For convenience, instead of returning `TruthTable`, it returns a list of
+    `TruthValues` which can be used directly in the Evaluator.
+    """
+    return list(iter_truth_table_variables(variables))
 
 
 class Evaluator:
     """Interpreter for the Syntax Tree of a Formula.
 
-    A recursive interpreter implementation for traversing the
-    Expression Tree of a propositional logic formula and
-    calculating the individual result of each node at every level.
+    An interpreter implementation for traversing the Expression Tree of a
+    propositional logic formula and calculating the individual result of each
+    node at every level. The traversal keeps the pending nodes in an explicit
+    stack instead of recursion, so that deeply nested formulas don't reach
+    Python's recursion limit.
     """
 
     values: TruthValues
 
+    columns: Collection[str] | None = None
+    "The labels of the results to store, or all of them if `None`"
+
     def eval(self, expr: Expr) -> bool:
-        """Map each expression's type to its corresponding evaluator function."""
-        if isinstance(expr, GroupExpr):
-            return self.eval(expr.child)
-        if isinstance(expr, VariableExpr):
-            return self.eval_variable(expr)
-        if isinstance(expr, UnaryExpr):
-            return self.eval_unary(expr)
-        if isinstance(expr, BinaryExpr):
-            return self.eval_binary(expr)
-        return False
+        """Evaluate the nodes of an expression in post-order and return its result.
+
+        Each node is visited twice, first to schedule its operands and then to
+        combine the results of its operands once they are evaluated.
+        """
+        results: list[bool] = []
+        stack: list[tuple[Expr, bool]] = [(expr, False)]
+        while stack:
+            expr, visited = stack.pop()
+            if isinstance(expr, GroupExpr):
+                stack.append((expr.child, False))
+            elif isinstance(expr, VariableExpr):
+                results.append(self.eval_variable(expr))
+            elif isinstance(expr, UnaryExpr) and visited:
+                results.append(self.eval_unary(expr, results.pop()))
+            elif isinstance(expr, UnaryExpr):
+                stack.extend([(expr, True), (expr.right, False)])
+            elif isinstance(expr, BinaryExpr) and visited:
+                right, left = results.pop(), results.pop()
+                results.append(self.eval_binary(expr, left, right))
+            elif isinstance(expr, BinaryExpr):
+                stack.extend([(expr, True), (expr.right, False), (expr.left, False)])
+            else:
+                results.append(False)
+        return results.pop()
 
     def eval_variable(self, expr: VariableExpr) -> bool:  # noqa: D102
         return bool(self.values.get(expr.name.value))
 
-    def eval_unary(self, expr: UnaryExpr) -> bool:  # noqa: D102
-        value = self.eval(expr.right)
+    def eval_unary(self, expr: UnaryExpr, value: bool) -> bool:  # noqa: D102
         if expr.operator.type == "not":
             value = not value
-        self.values[str(expr)] = value  # save result for each expression
+        self.store(expr, value)
         return value
 
-    def eval_binary(self, expr: BinaryExpr) -> bool:  # noqa: D102
-        left, right = self.eval(expr.left), self.eval(expr.right)
+    def eval_binary(self, expr: BinaryExpr, left: bool, right: bool) -> bool:  # noqa: D102
         value = False
         if expr.operator.type == "and":
             value = left and right
@@ -93,37 +175,123 @@ class Evaluator:
             value = (not left) or right
         if expr.operator.type == "only_if":
             value = left == right
-        self.values[str(expr)] = value  # save result for each expression
+        self.store(expr, value)
         return value
 
-    def evaluate(self, tree: Expr, values: TruthValues) -> TruthValues:
+    def store(self, expr: Expr, value: bool) -> None:
+        """Save the result of an expression, unless it's not a selected column."""
+        label = str(expr)
+        if self.columns is None or label in self.columns:
+            self.values[label] = value
+
+    def evaluate(
+        self,
+        tree: Expr,
+        values: TruthValues,
+        columns: Collection[str] | None = None,
+    ) -> TruthValues:
         """Evaluate & Store the sub-expressions of a formula.
 
         Given the root node of an expression tree and the truth values for all
         the variables in the expression tree, it returns an extended set of
         truth values including the results of the sub-expressions of the
-        propositional logic formula.
+        propositional logic formula. If `columns` is given, only the values of
+        those variables & sub-expressions are returned, while the rest are only
+        computed transiently.
         """
         self.values = dict(values)
+        self.columns = columns
         self.eval(tree)
-        return dict(self.values)
+        return {
+            key: value
+            for key, value in self.values.items()
+            if columns is None or key in columns
+        }
 
 
-def evaluate(tokens: list[Token], tree: Expr) -> TruthTable:
-    # wrapper function for convenience
+def evaluate(
+    tokens: list[Token],
+    tree: Expr,
+    columns: Collection[str] | None = None,
+) -> TruthTable:
+    # wrapper function for convenience, only keeps the given columns if any
 
     # filter & get variable names from list of tokens
-    variables = list({x.value for x in filter(lambda x: x.type == "variable", tokens)})
-    variables.sort()
+    variables = formula_variables(tokens)
 
-    table: TruthTable = {}
-    evaluator = Evaluator()
+    # compile the expression tree once instead of interpreting it for every row
+    compiled = compile_columns(tree, variables, columns)
+    table: TruthTable = {key: [] for key in compiled.labels}
 
     # for each truth values combination of the variables, evaluate the
-    # expression tree and aggregate the result into a truth table
-    for truth_values in truth_table_variables(variables):
-        values = evaluator.evaluate(tree, truth_values)
+    # expression tree then transpose the rows into the columns of a truth table
+    rows = product((True, False), repeat=len(variables))
+    for column, values in zip(table.values(), zip(*map(compiled, rows))):
+        column.extend(values)
+    return table
+
+
+def iter_truth_table(
+    tokens: list[Token],
+    tree: Expr,
+    where: Expr | bool | None = None,
+    columns: Collection[str] | None = None,
+    window: range | None = None,
+) -> Iterator[TruthValues]:
+    # wrapper function for convenience, yields the rows of the truth table one
+    # at a time so that only a single row is kept in memory, optionally only
+    # the rows of the given window
+
+    variables = formula_variables(tokens)
+    compiled = compile_columns(tree, variables, columns)
+
+    rows: Iterable[tuple[bool, ...]] = iter_rows(len(variables), window)
+    if where is not None:
+        rows = filter_rows(rows, tree, variables, where)
+
+    for row in rows:
+        yield dict(zip(compiled.labels, compiled(row)))
+
+
+def filter_rows(
+    rows: Iterable[tuple[bool, ...]],
+    tree: Expr,
+    variables: list[str],
+    where: Expr | bool,
+) -> Iterator[tuple[bool, ...]]:
+    """Skip the rows of the variables which don't match the filter.
+
+    The filter is either the result (`True` or `False`) of the formula, or
+    another formula over the same variables which must be `True`. It's compiled
+    into a separate function returning only its result, so that the
+    sub-expressions of the skipped rows are never evaluated.
+    """
+    expected = where if isinstance(where, bool) else True
+    predicate = compile_predicate(tree if isinstance(where, bool) else where, variables)
+    for row in rows:
+        if predicate(row)[0] == expected:
+            yield row
+
+
+def evaluate_where(  # noqa: PLR0913
+    tokens: list[Token],
+    tree: Expr,
+    where: Expr | bool | None = None,
+    limit: int | None = None,
+    columns: Collection[str] | None = None,
+    window: range | None = None,
+) -> TruthTable:
+    # wrapper function for convenience, returns only the first `limit` rows
+    # matching the filter and stops evaluating once they are found
+
+    variables = formula_variables(tokens)
+    rows = iter_truth_table(tokens, tree, where, columns, window)
+    table: TruthTable = {}
+    for values in islice(rows, limit):
         for key, value in values.items():
             table.setdefault(key, []).append(value)
 
+    if not table:  # keep the columns even if no rows match
+        labels = compile_columns(tree, variables, columns).labels
+        table = {key: [] for key in labels}
     return table
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
+from ttg.core.arena import NO_NODE, ExprArena, build_arena
+from ttg.core.evaluator import TruthTable, formula_variables
+
+if TYPE_CHECKING:
+    from ttg.core.lexer import Token, TokenType
+    from ttg.core.parser import Expr
+
+Operation = Callable[[bool, bool], bool]
+
+operations: dict[TokenType, Operation] = {
+    "not": lambda _, right: not right,
+    "and": lambda left, right: left and right,
+    "or": lambda left, right: left or right,
+    "then": lambda left, right: (not left) or right,
+    "only_if": lambda left, right: left == right,
+}
+"Functions for each operator, unary operators ignore the left operand"
+
+
+def unknown_operation(_left: bool, _right: bool) -> bool:
+    return False
+
+
+def gray_code(step: int) -> int:
+    """Get the `step`-th number in the sequence of the binary-reflected Gray code.
+
+    Consecutive numbers in the sequence differ by exactly one bit.
+    """
+    return step ^ (step >> 1)
+
+
+class IncrementalEvaluator:
+    """Incremental interpreter for the Syntax Tree of a Formula.
+
+    The rows of the truth table are visited in Gray-code order, wherein exactly
+    one variable flips between consecutive rows. The Expression Tree is
+    flattened into a list of nodes beforehand, and each variable keeps the
+    nodes that depend on it so that only those are recomputed after it flips.
+
+    The values of the variables & nodes are stored in a single list of "slots",
+    wherein the variables come first followed by the nodes.
+    """
+
+    variables: list[str]
+    labels: list[str]
+    "The label of each node"
+
+    slots: dict[str, int]
+    "The slot of each variable & node, keyed by its label"
+
+    nodes: list[tuple[int, Operation, int, int]]
+    "The slot, operation, and the slots of the operands of each node"
+
+    dependencies: list[set[int]]
+    "The variables that each slot depends on"
+
+    dependents: list[list[int]]
+    "The nodes that must be recomputed after a variable flips"
+
+    values: list[bool]
+
+    evaluations: int
+    "Total count of nodes computed so far"
+
+    def __init__(self, tree: Expr, variables: list[str]) -> None:  # noqa: D107
+        self.variables = variables
+        self.labels = []
+        self.slots = {variable: i for i, variable in enumerate(variables)}
+        self.nodes = []
+        self.dependencies = [{i} for i in range(len(variables))]
+        self.values = [True] * len(variables)
+        self.evaluations = 0
+
+        self.flatten(build_arena(tree))
+
+        # nodes are added after their operands, so the dependents of each
+        # variable are already sorted in the order they should be recomputed
+        self.dependents = [[] for _ in variables]
+        for index, node in enumerate(self.nodes):
+            for variable in self.dependencies[node[0]]:
+                self.dependents[variable].append(index)
+
+    # region Flattening
+
+    def flatten(self, arena: ExprArena) -> None:
+        """Assign a slot to each node of the arena of the Expression Tree.
+
+        Groups share the slot of their child, and shared sub-expressions are
+        already hash-consed into a single node by the arena.
+        """
+        node_slots: list[int] = []
+        for node, kind in enumerate(arena.kinds):
+            if kind == "group":
+                slot = node_slots[arena.rights[node]]
+            elif kind == "variable":
+                slot = self.slots.get(arena.labels[node], NO_NODE)
+                if slot == NO_NODE:
+                    slot = self.add_constant()
+            else:
+                # unary operators ignore the left operand, so it reuses the right
+                right = node_slots[arena.rights[node]]
+                left = right if kind == "unary" else node_slots[arena.lefts[node]]
+                operator = arena.operators[node] or "invalid"
+                operation = operations.get(operator, unknown_operation)
+                slot = self.add_node(arena.labels[node], operation, left, right)
+            node_slots.append(slot)
+
+    def add_constant(self) -> int:
+        """Add a slot which is always `False`, e.g. for unknown variables."""
+        self.dependencies.append(set())
+        self.values.append(False)
+        return len(self.values) - 1
+
+    def add_node(  # noqa: D102
+        self,
+        label: str,
+        operation: Operation,
+        left: int,
+        right: int,
+    ) -> int:
+        slot = len(self.values)
+        self.nodes.append((slot, operation, left, right))
+        self.dependencies.append(self.dependencies[left] | self.dependencies[right])
+        self.values.append(False)
+        self.slots[label] = slot
+        self.labels.append(label)
+        return slot
+
+    # endregion
+
+    def recompute(self, indexes: Iterable[int]) -> None:
+        """Recompute the values of the given nodes in order."""
+        nodes, values = self.nodes, self.values
+        for index in indexes:
+            slot, operation, left, right = nodes[index]
+            values[slot] = operation(values[left], values[right])
+            self.evaluations += 1
+
+    def walk(self) -> Iterator[tuple[int, list[bool]]]:
+        """Visit all the rows of the truth table in Gray-code order.
+
+        Yields the row index (in the order of `truth_table_variables`) and the
+        values of all the slots. The same list of values is updated in-place
+        between rows, so it must be copied if it is kept.
+        """
+        count = len(self.variables)
+        self.values[:count] = [True] * count
+        self.recompute(range(len(self.nodes)))
+        yield 0, self.values
+
+        for step in range(1, 1 << count):
+            # The lowest set bit of the step is the only bit that changes in
+            # its Gray code, where the highest bit represents the first variable
+            bit = (step & -step).bit_length() - 1
+            variable = count - 1 - bit
+            self.values[variable] = not self.values[variable]
+            self.recompute(self.dependents[variable])
+
+            # A set bit in the row index represents a `False` value, so the
+            # Gray code itself is the row index
+            yield gray_code(step), self.values
+
+
+def evaluate_gray(tokens: list[Token], tree: Expr) -> TruthTable:
+    # wrapper function for convenience, returns the same truth table as
+    # `evaluate` but visits the rows in Gray-code order
+
+    variables = formula_variables(tokens)
+    evaluator = IncrementalEvaluator(tree, variables)
+    columns = [*variables, *evaluator.labels]
+    slots = [evaluator.slots[column] for column in columns]
+
+    rows = 1 << len(variables)
+    table: TruthTable = {column: [False] * rows for column in columns}
+    cells = [(table[column], slot) for column, slot in zip(columns, slots)]
+    for index, values in evaluator.walk():
+        for cell, slot in cells:
+            cell[index] = values[slot]
+
+    return table
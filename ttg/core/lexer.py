@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import Literal
+from typing import Iterable, Iterator, Literal
 
 left_paren_regex = r"(?P<left_paren>\()"
 right_paren_regex = r"(?P<right_paren>\))"
@@ -59,6 +59,8 @@ TokenType = Literal[
 class Token:
     """Output data of the lexer after tokenizing the propositional logic formula."""
 
+    __slots__ = ("type", "value", "span")
+
     type: TokenType
     "The classification of the value of the token"
 
@@ -72,24 +74,91 @@ class Token:
         return self.value
 
 
-def tokenize(formula: str) -> list[Token]:
-    """Turn the input formula into a sequence of tokens.
+symbol_types: dict[str, TokenType] = {
+    "(": "left_paren",
+    ")": "right_paren",
+    "!": "not",
+    "~": "not",
+    "¬": "not",
+    "^": "and",
+    "∧": "and",
+    "∨": "or",  # noqa: RUF001
+    ">": "then",
+    "→": "then",
+    "↔": "only_if",
+}
+"Token types of the operators which are always a single character"
+
+combined_pattern = re.compile(combined_regex, re.IGNORECASE)
+invalid_pattern = re.compile(invalid_regex)
+
+
+def is_word(char: str) -> bool:
+    """Check if a character is a letter, digit, or underscore, same as in regexes."""
+    return char.isalnum() or char == "_"
 
-    The tokenize function is resilient and will not raise errors for invalid tokens
-    but will instead create a `Token(type="invalid")` added in the list.
+
+class Lexer:
+    """Single-pass scanner for propositional logic formulas.
+
+    Produces the same tokens as matching `combined_regex` throughout the
+    formula, but single-character operators & whitespace are dispatched directly
+    on the current character, and only the remaining tokens (words &
+    multi-character operators) are matched with the precompiled pattern
+    anchored at the current position. A single lexer can be reused to tokenize
+    many formulas.
     """
-    formula += " "
 
-    # iterate for regex matches on input
-    query = re.finditer(combined_regex, formula, re.IGNORECASE)
+    tokens: list[Token]
+
+    def tokenize(self, formula: str) -> list[Token]:
+        """Turn the input formula into a sequence of tokens.
+
+        The tokenize function is resilient and will not raise errors for invalid
+        tokens but will instead create a `Token(type="invalid")` added in the list.
+        """
+        tokens: list[Token] = []
+        self.tokens = tokens
+        position, length = 0, len(formula)
+        while position < length:
+            char = formula[position]
+
+            token_type = symbol_types.get(char)
+            if token_type is not None:
+                tokens.append(Token(token_type, char, (position, position + 1)))
+                position += 1
+                continue
+
+            if char.isspace():
+                position += 1
+                continue
+
+            # An anchored match can't tell that a word continues from before
+            # its position, in which case only `v` can still be an operator
+            if position > 0 and is_word(char) and is_word(formula[position - 1]):
+                if char in "vV":
+                    tokens.append(Token("or", char, (position, position + 1)))
+                    position += 1
+                    continue
+                match = invalid_pattern.match(formula, position)
+            else:
+                match = combined_pattern.match(formula, position)
+
+            if match is None:  # unreachable, `invalid` matches any non-whitespace
+                break
+            tokens.append(Token(match.lastgroup, match.group(), match.span()))  # type: ignore reportArgumentType
+            position = match.end()
+
+        return tokens
 
-    # filter empty matches
-    matches = filter(lambda match: match.group(), query)
 
-    # map regex matches to tokens
-    tokens = (
-        Token(type=match.lastgroup, value=match.group(), span=match.span())  # type: ignore reportArgumentType
-        for match in matches
-    )
+def tokenize(formula: str) -> list[Token]:
+    # wrapper function for convenience
+    return Lexer().tokenize(formula)
+
 
-    return list(tokens)
+def tokenize_many(formulas: Iterable[str]) -> Iterator[list[Token]]:
+    # wrapper function for convenience, reuses a single lexer for all formulas
+    lexer = Lexer()
+    for formula in formulas:
+        yield lexer.tokenize(formula)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import mmap
+from typing import TYPE_CHECKING
+
+from ttg.core.binary import BinaryHeader, decode_header
+from ttg.core.table import PackedColumn, PackedTruthTable
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from types import TracebackType
+
+
+class MappedTruthTable(PackedTruthTable):
+    """A bit-packed truth table file opened as a read-only `PackedTruthTable`.
+
+    The file is memory-mapped and each `PackedColumn` is a view of its bytes in
+    the file, so the table is never loaded into memory all at once. Only the
+    pages of the rows being read are loaded by the operating system, which
+    makes `row` and slicing the columns (or `window`) cheap for any row.
+    """
+
+    header: BinaryHeader
+    buffer: mmap.mmap
+    view: memoryview
+
+    def __init__(self, buffer: mmap.mmap) -> None:  # noqa: D107
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+        try:
+            self.header = decode_header(self.view)
+        except ValueError:
+            self.view.release()  # or else the file can't be unmapped
+            raise
+
+        size = (self.header.rows + 7) // 8
+        columns: dict[str, PackedColumn] = {}
+        for index, label in enumerate(self.header.labels):
+            offset = self.header.column_offset(index)
+            data = self.view[offset : offset + size]
+            columns[label] = PackedColumn(data, self.header.rows)
+        super().__init__(columns, self.header.rows)
+
+    @classmethod
+    def open(cls, path: Path) -> MappedTruthTable:
+        """Memory-map a bit-packed truth table file."""
+        with path.open("rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(buffer)
+        except Exception:
+            buffer.close()
+            raise
+
+    def close(self) -> None:
+        """Release the views of the columns, then unmap the file."""
+        for column in self.columns.values():
+            if isinstance(column.data, memoryview):
+                column.data.release()
+        self.columns = {}
+        self.view.release()
+        self.buffer.close()
+
+    def __enter__(self) -> MappedTruthTable:  # noqa: D105, PYI034
+        return self
+
+    def __exit__(  # noqa: D105
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __repr__(self) -> str:  # noqa: D105
+        return f"MappedTruthTable(columns={list(self.columns)}, rows={self.rows})"
+
+
+def open_truth_table(path: Path) -> MappedTruthTable:
+    # wrapper function for convenience
+    return MappedTruthTable.open(path)
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, Literal, Tuple
+
+from ttg.core.bitwise import variable_column
+
+if TYPE_CHECKING:
+    from ttg.core.table import PackedColumn
+
+NormalForm = Literal["dnf", "cnf"]
+
+Cube = Tuple[int, int]
+"""
+The Cube type is a product of literals as a `(value, mask)` pair over the bits of
+the row indices of a truth table. The bits set in the mask are the variables
+missing from the product, while the other bits of the value are the values of
+the variables, wherein the first variable is the most significant bit and `0`
+means `True` (the same order as the rows of the truth table).
+"""
+
+exact_variables = 10
+"Maximum count of variables minimized exactly with Quine-McCluskey by default"
+
+exact_branches = 1 << 16
+"Maximum count of partial covers searched by Quine-McCluskey before giving up"
+
+espresso_passes = 2
+"Maximum count of passes of the Espresso-style minimizer without an improvement"
+
+
+@dataclass
+class MinimizedFormula:
+    """A minimized Disjunctive or Conjunctive Normal Form of a truth table column."""
+
+    form: NormalForm
+    variables: list[str]
+
+    cubes: list[Cube]
+    "The terms of a DNF, or the negated clauses of a CNF (the rows where it's `False`)"
+
+    exact: bool
+    "Whether the cover was minimized exactly, or with the heuristic minimizer"
+
+    @property
+    def literals(self) -> int:
+        """Count of the literals in all the terms or clauses."""
+        count = len(self.variables)
+        full = (1 << count) - 1
+        return sum(bin(full & ~mask).count("1") for _, mask in self.cubes)
+
+    def term(self, cube: Cube) -> list[str]:
+        """Render the literals of a cube, negated in the clauses of a CNF."""
+        value, mask = cube
+        count = len(self.variables)
+        literals: list[str] = []
+        for index, variable in enumerate(self.variables):
+            bit = 1 << (count - 1 - index)
+            if mask & bit:
+                continue
+            negated = bool(value & bit) != (self.form == "cnf")
+            literals.append(f"!{variable}" if negated else variable)
+        return literals
+
+    def __str__(self) -> str:  # noqa: D105
+        inner, outer = (" & ", " | ") if self.form == "dnf" else (" | ", " & ")
+        terms = [self.term(cube) for cube in self.cubes]
+
+        # constants have no formula, so they're written with the first variable
+        first = self.variables[0] if self.variables else "P"
+        if not terms:  # no rows, so the DNF is `False` and the CNF is `True`
+            return f"{first}{inner}!{first}"
+        if [] in terms:  # all the rows, so the DNF is `True` and the CNF is `False`
+            return f"{first}{outer}!{first}"
+
+        if len(terms) == 1:
+            return inner.join(terms[0])
+        return outer.join(f"({inner.join(x)})" if len(x) > 1 else x[0] for x in terms)
+
+
+def iter_rows(column: int) -> Iterator[int]:
+    """Iterate the indices of the rows set in a bitmask."""
+    digits = format(column, "b")[::-1]
+    index = digits.find("1")
+    while index >= 0:
+        yield index
+        index = digits.find("1", index + 1)
+
+
+class QuineMcCluskey:
+    """Exact minimizer of the sum of products of a bitmask of rows.
+
+    All the prime implicants are generated by repeatedly merging the pairs of
+    cubes which differ in a single variable. Then the essential primes (the
+    only primes covering a row) are kept, and the rest of the rows are covered
+    by a branch & bound search over the primes covering each row, which keeps
+    the cover with the fewest cubes then the fewest literals.
+    """
+
+    count: int
+    rows: list[int]
+
+    def __init__(self, column: int, count: int) -> None:  # noqa: D107
+        self.count = count
+        self.rows = list(iter_rows(column))
+
+    def primes(self) -> list[Cube]:
+        """Generate all the prime implicants of the rows."""
+        primes: list[Cube] = []
+        cubes = {(row, 0) for row in self.rows}
+        while cubes:
+            merged: set[Cube] = set()
+            used: set[Cube] = set()
+            for value, mask in cubes:
+                for bit in (1 << x for x in range(self.count)):
+                    other = (value | bit, mask)
+                    if (value | mask) & bit or other not in cubes:
+                        continue
+                    merged.add((value, mask | bit))
+                    used.update(((value, mask), other))
+            primes += [cube for cube in cubes if cube not in used]
+            cubes = merged
+        return primes
+
+    def minimize(self) -> tuple[list[Cube], bool]:
+        """Find the smallest cover of the rows, and whether it's proven minimal."""
+        primes = self.primes()
+        sizes = [1 << bin(mask).count("1") for _, mask in primes]
+        covers = {
+            row: [x for x, (value, mask) in enumerate(primes) if row & ~mask == value]
+            for row in self.rows
+        }
+        for options in covers.values():  # the largest primes are searched first
+            options.sort(key=lambda x: sizes[x])
+
+        def cost(chosen: tuple[int, ...]) -> tuple[int, int]:
+            cubes = [primes[x] for x in chosen]
+            return len(cubes), sum(cube_literals(x, self.count) for x in cubes)
+
+        def bound(chosen: tuple[int, ...], uncovered: frozenset[int]) -> int:
+            # even the largest prime can only cover so many of the rows left
+            return len(chosen) + -(-len(uncovered) // max(sizes, default=1))
+
+        def cover(uncovered: frozenset[int], prime: int) -> frozenset[int]:
+            value, mask = primes[prime]
+            return frozenset(x for x in uncovered if x & ~mask != value)
+
+        # Start from a greedy cover, so that the search prunes its branches early
+        best: tuple[int, ...] = ()
+        uncovered: frozenset[int] = frozenset(covers)
+        while uncovered:
+            row = min(uncovered, key=lambda x: len(covers[x]))
+            options = covers[row]
+            if len(options) > 1:  # else the prime is essential
+                options = range(len(primes))
+            prime = min(options, key=lambda x: len(cover(uncovered, x)))
+            best = (*best, prime)
+            uncovered = cover(uncovered, prime)
+
+        stack: list[tuple[tuple[int, ...], frozenset[int]]] = [((), frozenset(covers))]
+        branches = 0
+        while stack and branches < exact_branches:
+            chosen, uncovered = stack.pop()
+            branches += 1
+            if bound(chosen, uncovered) > len(best):
+                continue
+            if not uncovered:
+                best = min(best, chosen, key=cost)
+                continue
+
+            # branch on the row covered by the fewest primes, which is
+            # essential if only a single prime covers it
+            row = min(uncovered, key=lambda x: len(covers[x]))
+            stack += [((*chosen, x), cover(uncovered, x)) for x in covers[row]]
+
+        return [primes[x] for x in best], not stack
+
+
+class Espresso:
+    """Heuristic minimizer of the sum of products of a bitmask of rows.
+
+    Follows the main loop of _Espresso_ over the bitmasks of the rows of each
+    cube instead of its cube algebra, starting from the cubes of the Shannon
+    decomposition of the column:
+
+    - Expand: drop the literals of each cube while it doesn't cover any row
+      where the column is `False`
+    - Irredundant: drop the cubes whose rows are covered by the other cubes
+    - Reduce: shrink each cube to the smallest cube covering the rows which
+      only it covers, so the next expansion can grow it in another direction
+
+    The passes repeat until the cover stops getting smaller.
+    """
+
+    count: int
+    full: int
+    "Bitmask of all the rows"
+
+    on: int
+    "Bitmask of the rows where the column is `True`"
+
+    off: int
+    "Bitmask of the rows where the column is `False`"
+
+    zeros: list[int]
+    "The bitmask of the rows wherein each bit of the row index is 0"
+
+    ones: list[int]
+    "The bitmask of the rows wherein each bit of the row index is 1"
+
+    rows: dict[Cube, int]
+    "The bitmask of the rows of each cube built before"
+
+    def __init__(self, column: int, count: int) -> None:  # noqa: D107
+        self.count = count
+        self.full = (1 << (1 << count)) - 1
+        self.on = column
+        self.off = self.full & ~column
+        self.zeros = [variable_column(count - 1 - bit, count) for bit in range(count)]
+        self.ones = [self.full & ~zeros for zeros in self.zeros]
+        self.rows = {}
+
+    def cube_rows(self, cube: Cube) -> int:
+        """Get the bitmask of the rows of a cube.
+
+        Similar to `variable_column`, the rows of the lowest bits are repeated
+        or shifted for each next bit, so the bitmask is only built once.
+        """
+        if cube in self.rows:
+            return self.rows[cube]
+
+        value, mask = cube
+        rows, width = 1, 1
+        for bit in range(self.count):
+            if mask >> bit & 1:
+                rows |= rows << width
+            elif value >> bit & 1:
+                rows <<= width
+            width <<= 1
+        self.rows[cube] = rows
+        return rows
+
+    def flip(self, rows: int, bit: int) -> int:
+        """Swap the rows wherein a bit of the row index is 0 with those where it's 1."""
+        run = 1 << bit
+        return (rows & self.zeros[bit]) << run | (rows & self.ones[bit]) >> run
+
+    def shannon(self) -> list[Cube]:
+        """Split the column by each variable into the cubes of its constant parts."""
+        cubes: list[Cube] = []
+        stack = [(self.on, self.count, 0, 0)]
+        while stack:
+            column, bits, value, mask = stack.pop()
+            size = 1 << bits
+            if column == 0:
+                continue
+            if column == (1 << size) - 1:
+                cubes.append((value, mask | (size - 1)))
+                continue
+
+            # the first half of the rows is where the variable of the bit is True
+            half, bit = size >> 1, 1 << (bits - 1)
+            low, high = column & ((1 << half) - 1), column >> half
+            if low == high:
+                stack.append((low, bits - 1, value, mask | bit))
+            else:
+                stack.append((low, bits - 1, value, mask))
+                stack.append((high, bits - 1, value | bit, mask))
+        return cubes
+
+    def expand(self, cubes: list[Cube], order: list[int]) -> list[Cube]:
+        """Drop the literals of each cube, in the given order of the bits."""
+        expanded: list[Cube] = []
+        for cube in sorted(cubes, key=lambda x: -bin(x[1]).count("1")):
+            value, mask = cube
+            # skip the cubes already covered by an expanded cube
+            if any(x[1] | mask == x[1] and value & ~x[1] == x[0] for x in expanded):
+                continue
+            rows = self.cube_rows((value, mask))
+            for bit in order:
+                if mask >> bit & 1:
+                    continue
+                grown = rows | self.flip(rows, bit)
+                if grown & self.off == 0:
+                    rows, value, mask = grown, value & ~(1 << bit), mask | 1 << bit
+            self.rows[value, mask] = rows
+            expanded.append((value, mask))
+        return expanded
+
+    def irredundant(self, cubes: list[Cube]) -> list[Cube]:
+        """Drop the cubes whose rows are covered by the rest of the cubes."""
+        rows = [self.cube_rows(x) for x in cubes]
+        suffixes = [0] * (len(cubes) + 1)
+        for i in range(len(cubes) - 1, -1, -1):
+            suffixes[i] = suffixes[i + 1] | rows[i]
+
+        # Each dropped cube is covered by the kept cubes & the cubes after it,
+        # which are in turn either kept or covered by the cubes after them
+        kept: list[Cube] = []
+        covered = 0
+        for i, cube in enumerate(cubes):
+            if rows[i] & ~(covered | suffixes[i + 1]):
+                kept.append(cube)
+                covered |= rows[i]
+        return kept
+
+    def reduce(self, cubes: list[Cube]) -> list[Cube]:
+        """Shrink each cube to the rows which only it covers."""
+        rows = [self.cube_rows(x) for x in cubes]
+        suffixes = [0] * (len(cubes) + 1)
+        for i in range(len(cubes) - 1, -1, -1):
+            suffixes[i] = suffixes[i + 1] | rows[i]
+
+        reduced: list[Cube] = []
+        covered = 0
+        for i in range(len(cubes)):
+            unique = rows[i] & ~(covered | suffixes[i + 1])
+            if unique == 0:
+                continue
+            cube = self.supercube(unique)
+            reduced.append(cube)
+            covered |= self.cube_rows(cube)
+        return reduced
+
+    def supercube(self, rows: int) -> Cube:
+        """Get the smallest cube covering the given rows."""
+        value = mask = 0
+        for bit, zeros in enumerate(self.zeros):
+            kept = rows & zeros
+            if kept and kept != rows:
+                mask |= 1 << bit
+            elif not kept:
+                value |= 1 << bit
+        return value, mask
+
+    def minimize(self) -> list[Cube]:
+        """Repeat the passes of the minimizer until the cover stops improving."""
+        order = list(range(self.count - 1, -1, -1))
+        cover = self.irredundant(self.expand(self.shannon(), order))
+        best = cover_cost(cover, self.count)
+
+        passes = 0
+        while passes < espresso_passes:
+            order.reverse()  # try to expand towards the other variables first
+            cubes = self.irredundant(self.expand(self.reduce(cover), order))
+            cost = cover_cost(cubes, self.count)
+            passes += 1
+            if cost < best:
+                cover, best, passes = cubes, cost, 0
+        return cover
+
+
+def cube_literals(cube: Cube, count: int) -> int:
+    """Count the literals of a cube."""
+    return count - bin(cube[1]).count("1")
+
+
+def cover_cost(cubes: list[Cube], count: int) -> tuple[int, int]:
+    """Get the count of cubes, then of literals, of a cover."""
+    return len(cubes), sum(cube_literals(x, count) for x in cubes)
+
+
+def minimize(
+    column: PackedColumn,
+    variables: list[str],
+    form: NormalForm = "dnf",
+    exact: int = exact_variables,
+) -> MinimizedFormula:
+    # wrapper function for convenience, minimizes the rows where the column is
+    # `True` for a DNF, or the rows where it's `False` for a CNF
+    count = len(variables)
+    bitmask = column.to_int()
+    if form == "cnf":
+        bitmask ^= (1 << (1 << count)) - 1
+
+    cubes, proven = [], False
+    if count <= exact:
+        cubes, proven = QuineMcCluskey(bitmask, count).minimize()
+    if not proven:  # keep the smaller cover if the exact search gave up
+        heuristic = Espresso(bitmask, count).minimize()
+        if not cubes or cover_cost(heuristic, count) < cover_cost(cubes, count):
+            cubes = heuristic
+    cubes.sort()
+    return MinimizedFormula(form, variables, cubes, proven)
@@ -8,7 +8,46 @@ if TYPE_CHECKING:
 
 
 class Expr:
-    """Represents the individual nodes of the Expression Tree."""
+    """Represents the individual nodes of the Expression Tree.
+
+    The text of each node is rendered only once then cached as its `label`,
+    which is reused by `__str__` instead of rendering the entire subtree again
+    every time. The labels are rendered without recursion, so that deeply nested
+    expression trees don't reach Python's recursion limit.
+    """
+
+    _label: str | None = None
+
+    @property
+    def label(self) -> str:
+        """The text of the expression, rendered from the labels of its children."""
+        # Render the labels of the descendants first in post-order, skipping
+        # the subtrees which are already rendered
+        stack: list[Expr] = [self]
+        while self._label is None:
+            expr = stack[-1]
+            pending = [
+                child
+                for child in expr.children()
+                if child._label is None  # noqa: SLF001
+            ]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            expr._label = expr.render()  # noqa: SLF001
+        return self._label
+
+    def children(self) -> list[Expr]:
+        """Get the direct sub-expressions of the expression."""
+        return []
+
+    def render(self) -> str:
+        """Render the text of the expression, given that its children are rendered."""
+        return ""
+
+    def __str__(self) -> str:  # noqa: D105
+        return self.label
 
     def json(self) -> Any:  # noqa: ANN401, D102
         pass
@@ -18,7 +57,10 @@ class Expr:
 class GroupExpr(Expr):  # noqa: D101
     child: Expr
 
-    def __str__(self) -> str:  # noqa: D105
+    def children(self) -> list[Expr]:  # noqa: D102
+        return [self.child]
+
+    def render(self) -> str:  # noqa: D102
         return f"({self.child})"
 
     def json(self):  # noqa: ANN201, D102
@@ -29,7 +71,7 @@ class GroupExpr(Expr):  # noqa: D101
 class VariableExpr(Expr):  # noqa: D101
     name: Token
 
-    def __str__(self) -> str:  # noqa: D105
+    def render(self) -> str:  # noqa: D102
         return str(self.name)
 
     def json(self):  # noqa: ANN201, D102
@@ -41,7 +83,10 @@ class UnaryExpr(Expr):  # noqa: D101
     operator: Token
     right: Expr
 
-    def __str__(self) -> str:  # noqa: D105
+    def children(self) -> list[Expr]:  # noqa: D102
+        return [self.right]
+
+    def render(self) -> str:  # noqa: D102
         space = ""
         if self.operator.__str__().isalpha():  # in case operator is a word
             space = " "
@@ -57,7 +102,10 @@ class BinaryExpr(Expr):  # noqa: D101
     operator: Token
     right: Expr
 
-    def __str__(self) -> str:  # noqa: D105
+    def children(self) -> list[Expr]:  # noqa: D102
+        return [self.left, self.right]
+
+    def render(self) -> str:  # noqa: D102
         return f"{self.left} {self.operator} {self.right}"
 
     def json(self):  # noqa: ANN201, D102
@@ -74,118 +122,105 @@ class ParserError(Exception):  # noqa: D101
     token: Token
 
 
-class Parser:
-    """Recursive-Descent Parser implementation for propositional logic formulas.
-
-    The grammar is defined in the individual parsing functions of this class in
-    a pseudo-BNF notation.
-    """
-
-    # region Expressions
-
-    def expr_primary(self) -> GroupExpr | VariableExpr:
-        """Parse primary expression.
+binding_powers: dict[TokenType, int] = {
+    "only_if": 1,
+    "then": 2,
+    "or": 3,
+    "and": 4,
+}
+"Precedence of each binary operator, wherein a higher value binds tighter"
 
-        expr_primary =
-            | ( expr )
-            | variable
-        """
-        if self.match(["left_paren"]):
-            expr = self.expr()
-            if not self.check("right_paren"):
-                raise ParserError("Expected ')'", self.peek())
-            self.next()
-            return GroupExpr(expr)
-
-        if self.match(["variable"]):
-            return VariableExpr(self.prev())
-
-        raise ParserError("Expected variable", self.peek())
 
-    def expr_not(self) -> Expr | VariableExpr | UnaryExpr:
-        """Parse a NOT expression.
-
-        expr_not =
-            | NOT expr_not
-            | expr_primary
-        """
-        if self.match(["not"]):
-            operator = self.prev()
-            right = self.expr_not()
-            return UnaryExpr(operator, right)
-
-        return self.expr_primary()
-
-    def expr_and(self):  # noqa: ANN201
-        """Parse an AND expression.
-
-        expr_and =
-            | expr_not AND expr_and
-            | expr_not
-        """
-        expr = self.expr_not()
-
-        while self.match(["and"]):
-            operator = self.prev()
-            right = self.expr_not()
-            expr = BinaryExpr(expr, operator, right)
-
-        return expr
+class Parser:
+    """Operator-Precedence Parser implementation for propositional logic formulas.
+
+    Parses the grammar below without recursion by keeping the pending operators
+    and operands in explicit stacks (similar to the _Shunting-Yard_ algorithm),
+    so that deeply nested formulas don't reach Python's recursion limit. All the
+    binary operators are left-associative.
+
+        expr_primary = ( expr ) | variable
+        expr_not = NOT expr_not | expr_primary
+        expr_and = expr_not AND expr_and | expr_not
+        expr_or = expr_and OR expr_or | expr_and
+        expr_then = expr_or THEN expr_then | expr_or
+        expr_only_if = expr_then ONLY_IF expr_only_if | expr_then
+        expr = expr_only_if
+    """
 
-    def expr_or(self):  # noqa: ANN201
-        """Parse an OR expression.
+    operands: list[Expr]
+    "Stack of the parsed expressions waiting for their operators"
 
-        expr_or =
-            | expr_and OR expr_or
-            | expr_and
-        """
-        expr = self.expr_and()
+    operators: list[Token]
+    "Stack of the NOT operators, binary operators, and '(' waiting for operands"
 
-        while self.match(["or"]):
-            operator = self.prev()
-            right = self.expr_and()
-            expr = BinaryExpr(expr, operator, right)
+    depth: int
+    "Count of '(' waiting for their ')'"
 
-        return expr
+    # region Expressions
 
-    def expr_then(self):  # noqa: ANN201
-        """Parse a THEN expression.
+    def expr(self) -> Expr:
+        """Parse any expression.
 
-        expr_then =
-            | expr_or THEN expr_then
-            | expr_or
+        Alternates between parsing an operand (a variable, preceded by any NOT
+        operators and '(') and parsing what follows it (any ')' then a binary
+        operator), until the expression ends.
         """
-        expr = self.expr_or()
-
-        while self.match(["then"]):
-            operator = self.prev()
-            right = self.expr_or()
-            expr = BinaryExpr(expr, operator, right)
+        self.operands, self.operators, self.depth = [], [], 0
 
-        return expr
+        while True:
+            self.expr_operand()
 
-    def expr_only_if(self):  # noqa: ANN201
-        """Parse a ONLY_IF expression.
+            while self.depth > 0 and self.match(["right_paren"]):
+                self.reduce_group()
 
-        expr_only_if =
-            | expr_then THEN expr_only_if
-            | expr_then
-        """
-        expr = self.expr_then()
+            if not self.match(list(binding_powers)):
+                break
 
-        while self.match(["only_if"]):
             operator = self.prev()
-            right = self.expr_then()
-            expr = BinaryExpr(expr, operator, right)
-
-        return expr
-
-    def expr(self):  # noqa: ANN201
-        """Parse any expression.
-
-        expr = expr_only_if
-        """
-        return self.expr_only_if()
+            self.reduce_binary(binding_powers[operator.type])
+            self.operators.append(operator)
+
+        if self.depth > 0:
+            raise ParserError("Expected ')'", self.peek())
+
+        self.reduce_binary(0)
+        return self.operands.pop()
+
+    def expr_operand(self) -> None:
+        """Parse the prefix operators up to the variable of an operand."""
+        while self.match(["not", "left_paren"]):
+            self.operators.append(self.prev())
+            self.depth += self.prev().type == "left_paren"
+
+        if not self.match(["variable"]):
+            raise ParserError("Expected variable", self.peek())
+
+        self.operands.append(VariableExpr(self.prev()))
+        self.reduce_not()
+
+    def reduce_not(self) -> None:
+        """Apply the pending NOT operators to the latest operand."""
+        while self.operators and self.operators[-1].type == "not":
+            right = self.operands.pop()
+            self.operands.append(UnaryExpr(self.operators.pop(), right))
+
+    def reduce_binary(self, power: int) -> None:
+        """Apply the pending binary operators which bind at least as tight."""
+        while self.operators:
+            top = binding_powers.get(self.operators[-1].type)
+            if top is None or top < power:  # stop at NOT operators and '('
+                break
+            right, left = self.operands.pop(), self.operands.pop()
+            self.operands.append(BinaryExpr(left, self.operators.pop(), right))
+
+    def reduce_group(self) -> None:
+        """Close the group of the latest '(' and apply the NOT operators before it."""
+        self.reduce_binary(0)
+        self.operators.pop()  # the matching '('
+        self.depth -= 1
+        self.operands.append(GroupExpr(self.operands.pop()))
+        self.reduce_not()
 
     # endregion
 
@@ -0,0 +1,442 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Literal
+
+from ttg.core.arena import ExprArena, build_arena
+
+if TYPE_CHECKING:
+    from ttg.core.evaluator import TruthValues
+    from ttg.core.parser import Expr
+
+Clause = List[int]
+"""
+The Clause type stores a disjunction of literals. Each literal is the
+positive (`True`) or negative (`False`) id of a variable, same as in the
+DIMACS CNF format. The ids of the variables start from 1.
+"""
+
+CheckMode = Literal["sat", "taut", "contra"]
+
+activity_decay = 0.95
+"Factor by which the activities of the older conflicts fade"
+
+restart_interval = 100
+"Count of conflicts before the first restart, which grows after every restart"
+
+
+# region Tseitin Transformation
+
+
+@dataclass
+class Cnf:
+    """A formula in Conjunctive Normal Form, equisatisfiable to the original."""
+
+    clauses: list[Clause]
+
+    variables: list[str]
+    "The names of the variables of the formula, wherein the n-th has the id n + 1"
+
+    count: int
+    "Count of the variables in the clauses, including the auxiliary variables"
+
+    root: int
+    "The literal holding the result of the formula"
+
+
+class TseitinEncoder:
+    """Converter of the Syntax Tree of a Formula into CNF.
+
+    Every binary sub-expression is replaced by a new auxiliary variable which is
+    constrained by a few clauses to be equivalent to its operator applied to its
+    operands, so that the size of the CNF only grows linearly with the size of
+    the formula (unlike distributing the operators, which can grow
+    exponentially). NOT operators simply negate the literal of their operand.
+    """
+
+    arena: ExprArena
+    clauses: list[Clause]
+    literals: list[int]
+    "The literal holding the result of each node"
+
+    ids: dict[str, int]
+    "The id of each variable"
+
+    count: int
+
+    def encode(self, node: int) -> int:
+        """Map each node's kind to its corresponding encoder function."""
+        kind = self.arena.kinds[node]
+        if kind == "group":
+            return self.literals[self.arena.rights[node]]
+        if kind == "variable":
+            return self.ids[self.arena.labels[node]]
+        if kind == "unary":
+            return self.encode_unary(node)
+        return self.encode_binary(node)
+
+    def encode_unary(self, node: int) -> int:  # noqa: D102
+        right = self.literals[self.arena.rights[node]]
+        return -right if self.arena.operators[node] == "not" else right
+
+    def encode_binary(self, node: int) -> int:  # noqa: D102
+        a = self.literals[self.arena.lefts[node]]
+        b = self.literals[self.arena.rights[node]]
+        operator = self.arena.operators[node]
+        if operator == "then":  # P -> Q is equivalent to !P | Q
+            operator, a = "or", -a
+
+        self.count += 1
+        x = self.count
+        if operator == "and":
+            self.clauses += [[-x, a], [-x, b], [x, -a, -b]]
+        elif operator == "or":
+            self.clauses += [[-x, a, b], [x, -a], [x, -b]]
+        elif operator == "only_if":
+            self.clauses += [[-x, -a, b], [-x, a, -b], [x, a, b], [x, -a, -b]]
+        else:
+            self.clauses += [[-x]]
+        return x
+
+    def convert(self, arena: ExprArena) -> Cnf:
+        """Convert the last tree added to the arena into CNF."""
+        self.arena = arena
+        self.clauses = []
+        self.literals = []
+
+        variables = arena.variables()
+        self.ids = {variable: i + 1 for i, variable in enumerate(variables)}
+        self.count = len(variables)
+
+        # the operands of each node come before the node itself
+        for node in range(len(arena)):
+            self.literals.append(self.encode(node))
+
+        root = self.literals[arena.roots[-1]]
+        return Cnf(self.clauses, variables, self.count, root)
+
+
+def tseitin(tree: Expr) -> Cnf:
+    # wrapper function for convenience
+    return TseitinEncoder().convert(build_arena(tree))
+
+
+# endregion
+
+# region CDCL Solver
+
+
+class Solver:
+    """Conflict-Driven Clause Learning (CDCL) SAT solver.
+
+    Searches for an assignment satisfying all the clauses by repeatedly deciding
+    the value of a variable then propagating the values implied by the clauses
+    which have a single unassigned literal left (unit propagation), using two
+    watched literals per clause. Upon a conflict, it learns a new clause from
+    the First Unique Implication Point (1UIP) which prevents the same conflict,
+    then jumps back to the level where the learned clause becomes unit.
+
+    The variables involved in recent conflicts are decided first (VSIDS), with
+    the last value they had (phase saving), and the search periodically restarts
+    while keeping the learned clauses.
+    """
+
+    clauses: list[Clause]
+    watches: dict[int, list[int]]
+    "The indexes of the clauses watching each literal"
+
+    values: list[int]
+    "The value of each variable: 1 for `True`, -1 for `False`, 0 if unassigned"
+
+    levels: list[int]
+    "The decision level when each variable was assigned"
+
+    reasons: list[int]
+    "The index of the clause which implied each variable, -1 if decided"
+
+    phases: list[int]
+    activities: list[float]
+    increment: float
+    queue: list[tuple[float, int]]
+    "Heap of the variables ordered by their activities"
+
+    trail: list[int]
+    "The assigned literals in the order they were assigned"
+
+    trail_limits: list[int]
+    "The size of the trail before each decision level"
+
+    head: int
+    "The index in the trail of the next literal to propagate"
+
+    conflicts: int
+    decisions: int
+    unsatisfiable: bool
+
+    def __init__(self, count: int) -> None:  # noqa: D107
+        self.clauses = []
+        self.watches = {}
+        for variable in range(1, count + 1):
+            self.watches[variable] = []
+            self.watches[-variable] = []
+
+        self.values = [0] * (count + 1)
+        self.levels = [0] * (count + 1)
+        self.reasons = [-1] * (count + 1)
+        self.phases = [-1] * (count + 1)
+        self.activities = [0.0] * (count + 1)
+        self.increment = 1.0
+        self.queue = [(0.0, variable) for variable in range(1, count + 1)]
+
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+        self.conflicts = 0
+        self.decisions = 0
+        self.unsatisfiable = False
+
+    # region Assignment
+
+    def value(self, literal: int) -> int:
+        """Get the value of a literal: 1 for `True`, -1 for `False`, 0 if unassigned."""
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def assign(self, literal: int, reason: int) -> None:
+        """Set a literal to `True`, implied by the clause at the given index."""
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def backtrack(self, level: int) -> None:
+        """Undo the assignments after the given decision level."""
+        if len(self.trail_limits) <= level:
+            return
+        limit = self.trail_limits[level]
+        for literal in self.trail[limit:]:
+            variable = abs(literal)
+            self.phases[variable] = self.values[variable]
+            self.values[variable] = 0
+            self.reasons[variable] = -1
+            heapq.heappush(self.queue, (-self.activities[variable], variable))
+        del self.trail[limit:]
+        del self.trail_limits[level:]
+        self.head = limit
+
+    # endregion
+
+    def add_clause(self, clause: Clause) -> None:
+        """Add a clause at the top level, before solving."""
+        literals = set(clause)
+        if any(-literal in literals for literal in literals):
+            return  # always satisfied
+
+        literals = [literal for literal in literals if self.value(literal) >= 0]
+        if any(self.value(literal) > 0 for literal in literals):
+            return
+        if not literals:
+            self.unsatisfiable = True
+        elif len(literals) == 1:
+            self.assign(literals[0], -1)
+        else:
+            self.watch(literals)
+
+    def watch(self, clause: Clause) -> int:
+        """Store a clause and watch its first two literals."""
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(index)
+        self.watches[clause[1]].append(index)
+        return index
+
+    def propagate(self) -> int:
+        """Assign the literals implied by unit clauses, and return any conflict.
+
+        Only the clauses watching a literal which became `False` are visited.
+        Each of them moves its watch to another literal which isn't `False`, or
+        else implies its other watched literal, or else is in conflict.
+        """
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+
+            watchers = self.watches[false_literal]
+            kept: list[int] = []
+            for position, index in enumerate(watchers):
+                clause = self.clauses[index]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+
+                if self.value(clause[0]) > 0:
+                    kept.append(index)
+                    continue
+
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) >= 0:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(index)
+                        break
+                else:
+                    kept.append(index)
+                    if self.value(clause[0]) < 0:
+                        kept.extend(watchers[position + 1 :])
+                        self.watches[false_literal] = kept
+                        return index
+                    self.assign(clause[0], index)
+
+            self.watches[false_literal] = kept
+        return -1
+
+    def analyze(self, conflict: int) -> tuple[Clause, int]:
+        """Learn a clause from a conflict and get the level to jump back to.
+
+        Resolves the conflicting clause with the reasons of its literals in the
+        reverse order of the trail, until only a single literal of the current
+        decision level is left (the First Unique Implication Point).
+        """
+        level = len(self.trail_limits)
+        learned: Clause = [0]
+        seen: set[int] = set()
+        pending = 0
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        literal = 0
+
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # watch the literal of the highest level after the asserting literal
+        second = max(range(1, len(learned)), key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[second] = learned[second], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, variable: int) -> None:
+        """Increase the activity of a variable involved in a conflict."""
+        self.activities[variable] += self.increment
+        if self.activities[variable] > 1e100:  # noqa: PLR2004
+            self.activities = [activity * 1e-100 for activity in self.activities]
+            self.increment *= 1e-100
+            self.queue = [(-self.activities[v], v) for _, v in self.queue]
+            heapq.heapify(self.queue)
+        if self.values[variable] == 0:
+            heapq.heappush(self.queue, (-self.activities[variable], variable))
+
+    def decide(self) -> int:
+        """Pick the unassigned variable with the highest activity, 0 if none."""
+        while self.queue:
+            _, variable = heapq.heappop(self.queue)
+            if self.values[variable] == 0:
+                return variable
+        return 0
+
+    def solve(self) -> bool:
+        """Search for an assignment satisfying all the clauses."""
+        if self.unsatisfiable:
+            return False
+
+        limit = restart_interval
+        while True:
+            conflict = self.propagate()
+            if conflict >= 0:
+                self.conflicts += 1
+                if not self.trail_limits:
+                    self.unsatisfiable = True
+                    return False
+
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], -1)
+                else:
+                    self.assign(learned[0], self.watch(learned))
+                self.increment /= activity_decay
+                continue
+
+            if self.conflicts >= limit:
+                limit += int(limit * 1.5)
+                self.backtrack(0)
+                continue
+
+            variable = self.decide()
+            if variable == 0:
+                return True
+            self.decisions += 1
+            self.trail_limits.append(len(self.trail))
+            self.assign(variable * self.phases[variable], -1)
+
+    def model(self, count: int) -> list[bool]:
+        """Get the values of the first `count` variables after solving."""
+        return [self.values[variable] > 0 for variable in range(1, count + 1)]
+
+
+# endregion
+
+
+@dataclass
+class CheckResult:
+    """The answer of a satisfiability, tautology, or contradiction check."""
+
+    mode: CheckMode
+
+    holds: bool
+    "Whether the formula is satisfiable, a tautology, or a contradiction"
+
+    assignment: TruthValues | None
+    """
+    The values of the variables which prove the answer: a witness if the formula
+    is satisfiable, or a counterexample if it is not a tautology or not a
+    contradiction. Otherwise, `None`.
+    """
+
+
+def find_assignment(cnf: Cnf, result: bool) -> TruthValues | None:
+    """Find values of the variables for which the formula has the given result."""
+    solver = Solver(cnf.count)
+    for clause in cnf.clauses:
+        solver.add_clause(clause)
+    solver.add_clause([cnf.root if result else -cnf.root])
+
+    if not solver.solve():
+        return None
+    return dict(zip(cnf.variables, solver.model(len(cnf.variables))))
+
+
+def check(tree: Expr, mode: CheckMode) -> CheckResult:
+    """Check if a formula is satisfiable, a tautology, or a contradiction.
+
+    Each check looks for a single assignment of the variables instead of
+    evaluating the entire truth table, and stops at the first one found.
+    """
+    cnf = tseitin(tree)
+    if mode == "sat":
+        assignment = find_assignment(cnf, result=True)
+        return CheckResult(mode, assignment is not None, assignment)
+
+    # a tautology is never `False`, and a contradiction is never `True`
+    assignment = find_assignment(cnf, result=mode != "taut")
+    return CheckResult(mode, assignment is None, assignment)
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Hashable, Literal, cast
+
+from ttg.core.arena import NO_NODE, build_arena
+from ttg.core.lexer import Token
+from ttg.core.parser import (
+    BinaryExpr,
+    Expr,
+    GroupExpr,
+    UnaryExpr,
+    VariableExpr,
+    binding_powers,
+)
+
+if TYPE_CHECKING:
+    from ttg.core.lexer import TokenType
+
+    TermKind = Literal[TokenType, "true", "false"]
+
+FALSE_TERM = 0
+TRUE_TERM = 1
+
+powers: dict[TokenType, int] = dict(binding_powers)
+"Precedence of each binary operator, by the kind of its terms"
+
+not_power = max(powers.values()) + 1
+"Precedence of the NOT operator, which binds tighter than any binary operator"
+
+max_operands = 32
+"Maximum count of operands of an `and` or `or` chain compared by the rules"
+
+default_spellings: dict[str, str] = {
+    "not": "!",
+    "and": "&",
+    "or": "|",
+    "then": "->",
+    "only_if": "<->",
+}
+"Spelling of the operators added by the rules which the formula doesn't use"
+
+duals: dict[TokenType, TokenType] = {"and": "or", "or": "and"}
+
+
+class Simplifier:
+    """Fixed-point rule engine rewriting a formula into a smaller equivalent one.
+
+    Each distinct sub-expression is hash-consed into a "term", ignoring its
+    groups and the spelling of its operators. Every term is only created through
+    the rules below, which are applied to its already simplified operands, and
+    any term produced by a rule is fed back into the rules until none applies.
+
+    - Constants: `x & True = x`, `x | True = True`, `x -> False = !x`, ...
+    - Double Negation: `!!x = x`
+    - Idempotence: `x & x = x`, also within chains such as `x & y & x`
+    - Complement: `x & !x = False`, `x | !x = True`, `x <-> !x = False`, ...
+    - Absorption: `x & (x | y) = x`, `x | (x & y) = x`, also within chains such
+      as `(x | y) & z & x`
+
+    The constants only exist while rewriting, and the groups are only added back
+    where the precedence of the operators needs them. If the entire formula is
+    constant, it's rewritten into `x | !x` or `x & !x` of its first variable.
+    """
+
+    kinds: list[TermKind]
+    "The operator of each term, or else `variable`, `true` or `false`"
+
+    lefts: list[int]
+    "The left operand of each binary term"
+
+    rights: list[int]
+    "The right operand of each unary or binary term"
+
+    names: list[str]
+    "The name of each variable term"
+
+    ids: dict[Hashable, int]
+
+    chains: dict[int, frozenset[int]]
+    "The operands of each chain of `and` or `or` terms, if not too long"
+
+    tokens: dict[str, Token]
+    "The first token of each variable & operator, reused to build the formula"
+
+    rewrites: int
+    "Count of the rules applied"
+
+    def __init__(self) -> None:  # noqa: D107
+        self.kinds, self.lefts, self.rights, self.names = [], [], [], []
+        self.ids = {}
+        self.intern("false")
+        self.intern("true")
+        self.chains = {}
+        self.tokens = {}
+        self.rewrites = 0
+
+    def simplify(self, tree: Expr) -> Expr:
+        """Rewrite an expression tree into a smaller equivalent tree.
+
+        The tree is kept as is if it can't be made smaller, e.g. if it's already
+        the smallest formula of a constant like `P | !P`.
+        """
+        simplified = self.build(self.add(tree))
+        if len(build_arena(simplified)) >= len(build_arena(tree)):
+            return tree
+        return simplified
+
+    # region Terms
+
+    def add(self, expr: Expr) -> int:
+        """Convert the nodes of an expression in post-order, like `ExprArena`."""
+        results: list[int] = []
+        stack: list[tuple[Expr, bool]] = [(expr, False)]
+        while stack:
+            expr, visited = stack.pop()
+            if not visited and not isinstance(expr, VariableExpr):
+                stack.append((expr, True))
+                stack.extend((child, False) for child in reversed(expr.children()))
+                continue
+
+            children = [results.pop() for _ in expr.children()][::-1]
+            results.append(self.add_node(expr, children))
+        return results.pop()
+
+    def add_node(self, expr: Expr, children: list[int]) -> int:
+        """Map each expression's type to its corresponding term, given its children."""
+        if isinstance(expr, GroupExpr):
+            return children[0]
+        if isinstance(expr, VariableExpr):
+            self.tokens.setdefault(expr.name.value, expr.name)
+            return self.intern("variable", name=expr.name.value)
+        if isinstance(expr, UnaryExpr):
+            self.tokens.setdefault(expr.operator.type, expr.operator)
+            return self.negate(children[0])
+        if isinstance(expr, BinaryExpr):
+            self.tokens.setdefault(expr.operator.type, expr.operator)
+            return self.binary(expr.operator.type, *children)
+        raise TypeError(f"Unknown expression: {expr!r}")
+
+    def intern(
+        self,
+        kind: TermKind,
+        left: int = NO_NODE,
+        right: int = NO_NODE,
+        name: str = "",
+    ) -> int:
+        """Get the existing term with the same key, or add a new term."""
+        key = (kind, left, right, name)
+        if key in self.ids:
+            return self.ids[key]
+
+        term = len(self.kinds)
+        self.kinds.append(kind)
+        self.lefts.append(left)
+        self.rights.append(right)
+        self.names.append(name)
+        self.ids[key] = term
+        return term
+
+    def complement(self, term: int) -> int | None:
+        """Get the negation of a term if it exists, without adding it."""
+        if self.kinds[term] == "not":
+            return self.rights[term]
+        return self.ids.get(("not", NO_NODE, term, ""))
+
+    def operands(self, term: int, operator: TokenType) -> frozenset[int]:
+        """Get the operands of a chain of the operator, or else only the term."""
+        if self.kinds[term] != operator:
+            return frozenset((term,))
+        return self.chains.get(term, frozenset((term,)))
+
+    def rewrite(self, term: int) -> int:
+        """Record that a rule was applied, which rewrote a term into the given term."""
+        self.rewrites += 1
+        return term
+
+    # endregion
+
+    # region Rules
+
+    def negate(self, term: int) -> int:  # noqa: D102
+        if term in (FALSE_TERM, TRUE_TERM):
+            return self.rewrite(TRUE_TERM if term == FALSE_TERM else FALSE_TERM)
+        if self.kinds[term] == "not":
+            return self.rewrite(self.rights[term])
+        return self.intern("not", right=term)
+
+    def binary(self, operator: TokenType, left: int, right: int) -> int:
+        """Map each operator to its corresponding rules."""
+        if operator in duals:
+            return self.join(operator, left, right)
+        if operator == "then":
+            return self.imply(left, right)
+        return self.equate(left, right)
+
+    def join(self, operator: TokenType, left: int, right: int) -> int:
+        """Apply the rules of `and`, and of `or` which is its dual."""
+        identity, zero = TRUE_TERM, FALSE_TERM
+        if operator == "or":
+            identity, zero = zero, identity
+
+        if zero in (left, right):
+            return self.rewrite(zero)
+        if identity in (left, right):
+            return self.rewrite(left + right - identity)
+
+        lefts, rights = self.operands(left, operator), self.operands(right, operator)
+        joined = self.join_chains(operator, left, right)
+        if joined is not None:
+            return self.rewrite(zero if joined == NO_NODE else joined)
+        absorbed = self.absorb(operator, left, right)
+        if absorbed is not None:
+            return self.rewrite(absorbed)
+
+        term = self.intern(operator, left, right)
+        if len(lefts) + len(rights) <= max_operands:
+            self.chains[term] = lefts | rights
+        return term
+
+    def join_chains(self, operator: TokenType, left: int, right: int) -> int | None:
+        """Apply the rules comparing the operands of two chains of `and` or `or`.
+
+        Returns the operand which the other is absorbed into, `NO_NODE` if the
+        chains contradict each other (e.g. `x & y & !x`), or `None` otherwise.
+        """
+        lefts, rights = self.operands(left, operator), self.operands(right, operator)
+        if rights <= lefts:
+            return left
+        if lefts <= rights:
+            return right
+        if any(self.complement(x) in lefts for x in rights):
+            return NO_NODE
+        return None
+
+    def absorb(self, operator: TokenType, left: int, right: int) -> int | None:
+        """Apply absorption between every operand of two chains of `and` or `or`.
+
+        An operand of one chain is dropped if it's a chain of the dual operator
+        which contains every operand of the dual chain of an operand of the other
+        chain, e.g. `x | y` by `x` in `(x | y) & z & x`. The remaining operands
+        are then joined again in order, or `None` is returned if none is dropped.
+        Each chain is already absorbed within itself while it's built.
+        """
+        dual = duals[operator]
+        lefts, rights = self.members(left, operator), self.members(right, operator)
+        duals_of = {x: self.operands(x, dual) for x in lefts + rights}
+
+        def absorbed(term: int, others: list[int]) -> bool:
+            return self.kinds[term] == dual and any(
+                duals_of[x] <= duals_of[term] for x in others
+            )
+
+        kept = [x for x in lefts if not absorbed(x, rights)]
+        kept += [x for x in rights if not absorbed(x, kept)]
+        if len(kept) == len(lefts) + len(rights):
+            return None
+
+        term = kept[0]
+        for operand in kept[1:]:
+            term = self.join(operator, term, operand)
+        return term
+
+    def members(self, term: int, operator: TokenType) -> list[int]:
+        """Get the operands of a chain of the operator in order, like `operands`."""
+        members: list[int] = []
+        stack = [term]
+        while stack:
+            term = stack.pop()
+            if self.kinds[term] == operator and term in self.chains:
+                stack.extend((self.rights[term], self.lefts[term]))
+            else:
+                members.append(term)
+        return members
+
+    def imply(self, left: int, right: int) -> int:  # noqa: D102
+        if left in (FALSE_TERM, right) or right == TRUE_TERM:
+            return self.rewrite(TRUE_TERM)
+        if left == TRUE_TERM:
+            return self.rewrite(right)
+        if right == FALSE_TERM:
+            return self.rewrite(self.negate(left))
+        if self.complement(left) == right:  # x -> !x = !x, and !x -> x = x
+            return self.rewrite(right)
+        return self.intern("then", left, right)
+
+    def equate(self, left: int, right: int) -> int:  # noqa: D102
+        if left == right:
+            return self.rewrite(TRUE_TERM)
+        if self.complement(left) == right:
+            return self.rewrite(FALSE_TERM)
+        if TRUE_TERM in (left, right):
+            return self.rewrite(left + right - TRUE_TERM)
+        if FALSE_TERM in (left, right):
+            return self.rewrite(self.negate(left + right - FALSE_TERM))
+        return self.intern("only_if", left, right)
+
+    # endregion
+
+    # region Building
+
+    def token(self, key: str) -> Token:
+        """Get the token of a variable or operator, or else its default spelling."""
+        if key not in self.tokens:
+            operator = cast("TokenType", key)
+            self.tokens[key] = Token(operator, default_spellings[key], (0, 0))
+        return self.tokens[key]
+
+    def build(self, root: int) -> Expr:
+        """Convert a term back into an expression tree, adding the needed groups."""
+        if root in (FALSE_TERM, TRUE_TERM):
+            variable = VariableExpr(self.token(min(x for x in self.names if x)))
+            negated = UnaryExpr(self.token("not"), variable)
+            operator = self.token("or" if root == TRUE_TERM else "and")
+            return BinaryExpr(variable, operator, negated)
+
+        # Build the operands of each term first in post-order, sharing the
+        # expressions of the terms used more than once
+        exprs: dict[int, Expr] = {}
+        stack = [root]
+        while stack:
+            term = stack[-1]
+            if term in exprs:  # shared by several terms
+                stack.pop()
+                continue
+            left, right = self.lefts[term], self.rights[term]
+            pending = [x for x in (left, right) if x != NO_NODE and x not in exprs]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            exprs[term] = self.build_term(term, exprs)
+        return exprs[root]
+
+    def build_term(self, term: int, exprs: dict[int, Expr]) -> Expr:
+        """Convert a single term, given the expressions of its operands."""
+        kind = self.kinds[term]
+        if kind == "variable":
+            return VariableExpr(self.token(self.names[term]))
+        if kind == "not":
+            right = self.group(exprs[self.rights[term]], self.rights[term], not_power)
+            return UnaryExpr(self.token(kind), right)
+
+        # Binary operators are left-associative, so the right operand needs a
+        # group even for an operator of the same precedence
+        power = powers[cast("TokenType", kind)]
+        left = self.group(exprs[self.lefts[term]], self.lefts[term], power)
+        right = self.group(exprs[self.rights[term]], self.rights[term], power + 1)
+        return BinaryExpr(left, self.token(kind), right)
+
+    def group(self, expr: Expr, term: int, power: int) -> Expr:
+        """Wrap an operand in a group if it binds looser than the given power."""
+        kind = self.kinds[term]
+        if kind in powers and powers[kind] < power:
+            return GroupExpr(expr)
+        return expr
+
+    # endregion
+
+
+def simplify(tree: Expr) -> Expr:
+    # wrapper function for convenience
+    return Simplifier().simplify(tree)
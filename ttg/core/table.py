@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from typing import (
+    TYPE_CHECKING,
+    Collection,
+    Iterable,
+    Iterator,
+    Mapping,
+    Sequence,
+    overload,
+)
+
+if TYPE_CHECKING:
+    from ttg.core.evaluator import TruthTable, TruthValues
+
+TruthTableLike = Mapping[str, Sequence[bool]]
+"""
+Any read-only truth table, such as the `TruthTable` dictionary of lists or the
+bit-packed `PackedTruthTable`.
+"""
+
+chunk_size = 1 << 16
+"Count of bytes unpacked at a time when iterating a column"
+
+ascii_bits = bytes.maketrans(b"\x00\x01", b"01")
+"Translation table from bytes of `0` & `1` values into ASCII digits"
+
+
+class PackedColumn(Sequence[bool]):
+    """A column of a truth table storing a single bit for each row.
+
+    The n-th row is stored in the (n % 8)-th bit of the (n // 8)-th byte,
+    which is equivalent to the little-endian bytes of the bitmask of the column.
+    The bytes are either in memory, or a view of a memory-mapped file.
+    """
+
+    __slots__ = ("data", "length")
+
+    data: bytes | memoryview
+    length: int
+
+    def __init__(self, data: bytes | memoryview, length: int) -> None:  # noqa: D107
+        self.data = data
+        self.length = length
+
+    @classmethod
+    def from_int(cls, column: int, length: int) -> PackedColumn:
+        """Create a column from a bitmask, wherein the n-th bit is the n-th row."""
+        return cls(column.to_bytes((length + 7) // 8, "little"), length)
+
+    @classmethod
+    def from_bools(cls, values: Iterable[bool]) -> PackedColumn:
+        """Create a column from the boolean value of each row."""
+        # The values are converted into a string of binary digits, then reversed
+        # so that the first row becomes the least significant bit
+        digits = bytes(values).translate(ascii_bits)
+        return cls.from_int(int(digits[::-1] or b"0", 2), len(digits))
+
+    def to_int(self) -> int:
+        """Convert the column into a bitmask, wherein the n-th bit is the n-th row."""
+        return int.from_bytes(self.data, "little")
+
+    def to_list(self) -> list[bool]:  # noqa: D102
+        return list(self)
+
+    def digits(self, start: int = 0, stop: int | None = None) -> bytes:
+        """Get the values of the rows from start to stop as ASCII `0` & `1` digits."""
+        stop = self.length if stop is None else min(stop, self.length)
+        if start >= stop:
+            return b""
+        first, last = start >> 3, (stop + 7) >> 3
+        chunk = int.from_bytes(self.data[first:last], "little")
+        digits = format(chunk, f"0{(last - first) * 8}b").encode()[::-1]
+        offset = start - first * 8
+        return digits[offset : offset + stop - start]
+
+    def window(self, start: int, stop: int) -> PackedColumn:
+        """Get a new column of the rows from start to stop."""
+        stop = min(stop, self.length)
+        start = min(start, stop)
+        chunk = int.from_bytes(self.data[start >> 3 : (stop + 7) >> 3], "little")
+        mask = (1 << (stop - start)) - 1
+        return PackedColumn.from_int(chunk >> (start & 7) & mask, stop - start)
+
+    def count_true(self) -> int:
+        """Count the rows with a `True` value."""
+        return bin(self.to_int()).count("1")
+
+    def __len__(self) -> int:  # noqa: D105
+        return self.length
+
+    @overload
+    def __getitem__(self, index: int) -> bool: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[bool]: ...
+
+    def __getitem__(self, index: int | slice) -> bool | list[bool]:  # noqa: D105
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step == 1:  # unpack only the bytes of the contiguous rows
+                return list(map(b"1"[0].__eq__, self.digits(start, stop)))
+            return [self[i] for i in range(start, stop, step)]
+
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("column index out of range")
+        return bool(self.data[index >> 3] >> (index & 7) & 1)
+
+    def __iter__(self) -> Iterator[bool]:  # noqa: D105
+        # Unpack the bits in chunks to avoid unpacking the entire column at once
+        for offset in range(0, len(self.data), chunk_size):
+            chunk = self.data[offset : offset + chunk_size]
+            size = min(len(chunk) * 8, self.length - offset * 8)
+            digits = format(int.from_bytes(chunk, "little"), f"0{len(chunk) * 8}b")
+            yield from map("1".__eq__, digits[::-1][:size])
+
+    def __eq__(self, other: object) -> bool:  # noqa: D105
+        if isinstance(other, PackedColumn):
+            return self.length == other.length and self.data == other.data
+        if isinstance(other, Sequence):
+            return list(self) == list(other)  # type: ignore reportUnknownArgumentType
+        return NotImplemented
+
+    def __hash__(self) -> int:  # noqa: D105
+        return hash((self.length, self.data))
+
+    def __repr__(self) -> str:  # noqa: D105
+        return f"PackedColumn(length={self.length})"
+
+
+class PackedTruthTable(Mapping[str, PackedColumn]):
+    """A bit-packed truth table storing a `PackedColumn` for each expression.
+
+    It behaves like a read-only `TruthTable` while using a single bit for each
+    value instead of a reference to a `bool`.
+    """
+
+    columns: dict[str, PackedColumn]
+    rows: int
+
+    def __init__(self, columns: dict[str, PackedColumn], rows: int) -> None:  # noqa: D107
+        self.columns = columns
+        self.rows = rows
+
+    @classmethod
+    def from_table(cls, table: TruthTableLike) -> PackedTruthTable:
+        """Pack each column of an existing truth table."""
+        columns = {
+            key: PackedColumn.from_bools(column) for key, column in table.items()
+        }
+        rows = len(next(iter(columns.values()))) if columns else 0
+        return cls(columns, rows)
+
+    def to_dict(self) -> TruthTable:
+        """Unpack the truth table into a dictionary of lists."""
+        return {key: column.to_list() for key, column in self.columns.items()}
+
+    def select(self, columns: Collection[str]) -> PackedTruthTable:
+        """Get a truth table with only the given columns, in their current order."""
+        selected = {key: self.columns[key] for key in self.columns if key in columns}
+        return PackedTruthTable(selected, self.rows)
+
+    def row(self, index: int) -> TruthValues:
+        """Get the values of all the columns in the index-th row."""
+        return {key: column[index] for key, column in self.columns.items()}
+
+    def window(self, start: int, stop: int) -> PackedTruthTable:
+        """Get a truth table with only the rows from start to stop."""
+        stop, start = min(stop, self.rows), min(start, stop, self.rows)
+        columns = {
+            key: column.window(start, stop) for key, column in self.columns.items()
+        }
+        return PackedTruthTable(columns, stop - start)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the bits of all the columns in bytes."""
+        return sum(len(column.data) for column in self.columns.values())
+
+    def __getitem__(self, key: str) -> PackedColumn:  # noqa: D105
+        return self.columns[key]
+
+    def __iter__(self) -> Iterator[str]:  # noqa: D105
+        return iter(self.columns)
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.columns)
+
+    def __repr__(self) -> str:  # noqa: D105
+        return f"PackedTruthTable(columns={list(self.columns)}, rows={self.rows})"
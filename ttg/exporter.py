@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import sys
+from typing import IO, TYPE_CHECKING, Literal
+
+from ttg.core.binary import write_binary
+from ttg.core.table import PackedTruthTable
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from ttg.core.table import TruthTableLike
+
+OutputFormat = Literal["csv", "jsonl", "bin"]
+"Formats for writing the truth table into a file instead of the console"
+
+output_suffixes: dict[str, OutputFormat] = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ttgt": "bin",
+    ".bin": "bin",
+}
+"Format of an output file inferred from its extension"
+
+chunk_rows = 1 << 16
+"Count of rows formatted & written at a time"
+
+
+def format_from_path(path: Path) -> OutputFormat | None:
+    """Infer the format of an output file from its extension, if known."""
+    return output_suffixes.get(path.suffix.lower())
+
+
+def write_cells(
+    table: PackedTruthTable,
+    file: IO[bytes],
+    separators: list[bytes],
+    cells: tuple[bytes, bytes],
+) -> None:
+    """Write each row as a line of fixed-width cells in chunks of `chunk_rows`.
+
+    The `separators` come before each cell, plus one at the end of each line,
+    and `cells` are the `False` & `True` cells which have the same width. Since
+    every line of a chunk has the same length, the cells of each column are
+    written into the buffer of the chunk at once with extended slices instead
+    of formatting each cell of each row one by one.
+    """
+    width = len(cells[0])
+    template = b"".join(separator + cells[0] for separator in separators[:-1])
+    template += separators[-1]
+
+    positions: list[int] = []
+    position = 0
+    for separator in separators[:-1]:
+        positions.append(position + len(separator))
+        position += len(separator) + width
+
+    # translate the `0` & `1` digits of a column into the i-th byte of its cells
+    translations = [
+        bytes.maketrans(b"01", bytes([cells[0][i], cells[1][i]])) for i in range(width)
+    ]
+
+    columns = list(table.columns.values())
+    for start in range(0, table.rows, chunk_rows):
+        stop = min(start + chunk_rows, table.rows)
+        buffer = bytearray(template * (stop - start))
+        for column, position in zip(columns, positions):
+            digits = column.digits(start, stop)
+            for i, translation in enumerate(translations):
+                buffer[position + i :: len(template)] = digits.translate(translation)
+        file.write(buffer)
+
+
+def write_csv(table: PackedTruthTable, file: IO[bytes]) -> None:
+    """Write a header of the labels, then each row with `1` & `0` cells."""
+    header = io.StringIO()
+    csv.writer(header, lineterminator="\n").writerow(table.columns)
+    file.write(header.getvalue().encode())
+
+    if not table.columns:
+        file.write(b"\n" * table.rows)
+        return
+
+    separators = [b"", *(b"," for _ in range(len(table) - 1))]
+    write_cells(table, file, [*separators, b"\n"], (b"0", b"1"))
+
+
+def write_jsonl(table: PackedTruthTable, file: IO[bytes]) -> None:
+    """Write each row as a JSON object of its values keyed by their labels."""
+    if not table.columns:
+        file.write(b"{}\n" * table.rows)
+        return
+
+    # `true` is padded with a space to have the same width as `false`
+    separators = [
+        f"{'{' if i == 0 else ', '}{json.dumps(label)}: ".encode()
+        for i, label in enumerate(table.columns)
+    ]
+    write_cells(table, file, [*separators, b"}\n"], (b"false", b" true"))
+
+
+def export_table(
+    table: TruthTableLike,
+    file: IO[bytes],
+    output_format: OutputFormat,
+) -> None:
+    """Write a truth table into a binary file in the given format."""
+    if not isinstance(table, PackedTruthTable):
+        table = PackedTruthTable.from_table(table)
+
+    if output_format == "csv":
+        write_csv(table, file)
+    elif output_format == "jsonl":
+        write_jsonl(table, file)
+    else:
+        write_binary(table, file)
+
+
+def export_truth_table(
+    table: TruthTableLike,
+    output_format: OutputFormat,
+    path: Path | None = None,
+) -> None:
+    # wrapper function for convenience, writes into the standard output if no
+    # path is given
+
+    if path is None:
+        export_table(table, sys.stdout.buffer, output_format)
+        sys.stdout.buffer.flush()
+        return
+
+    with path.open("wb") as file:
+        export_table(table, file, output_format)
@@ -1,7 +1,15 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from rich.table import Table
 from rich.text import Text
 
-from ttg.core.evaluator import TruthTable
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from ttg.core.evaluator import TruthValues
+    from ttg.core.table import TruthTableLike
 
 
 def format_bool(value: bool) -> Text:
@@ -17,7 +25,7 @@ def format_bool(value: bool) -> Text:
     return text
 
 
-def format_truth_table(values: TruthTable, title: str = "Truth Table") -> Table:
+def format_truth_table(values: TruthTableLike, title: str = "Truth Table") -> Table:
     """Format the truth-table for console display."""
     table = Table(title=title)
 
@@ -27,10 +35,45 @@ def format_truth_table(values: TruthTable, title: str = "Truth Table") -> Table:
         table.add_column(column, justify="center")
 
     # Gather the values of the formulas for each row/index
-    row_count = len(values[columns[0]])
-    for i in range(row_count):
-        row = (values[column][i] for column in columns)
+    for row in zip(*values.values()):
         row_str = (format_bool(value) for value in row)
         table.add_row(*row_str)
 
     return table
+
+
+def format_truth_row(row: Iterable[Text], widths: list[int]) -> Text:
+    """Format the cells of a single row as a line for console display."""
+    line = Text("│")
+    for cell, width in zip(row, widths):
+        cell.align("center", width + 2)
+        line.append_text(cell)
+        line.append("│")
+    return line
+
+
+def format_truth_rows(
+    rows: Iterable[TruthValues],
+    title: str = "Truth Table",
+) -> Iterator[Text]:
+    """Format the truth-table as lines for console display as the rows arrive.
+
+    Unlike `format_truth_table`, which needs all the rows beforehand to lay out
+    the table, the width of each column is based solely on its header so that
+    each row can be printed as soon as it is evaluated.
+    """
+    widths: list[int] = []
+    for i, row in enumerate(rows):
+        if i == 0:
+            columns = list(row.keys())
+            widths = [max(len(column), len("False")) for column in columns]
+            border = "─" * (sum(widths) + 3 * len(widths) + 1)
+
+            heading = Text(title, style="italic")
+            heading.align("center", len(border))
+            yield heading
+            yield Text(border)
+            yield format_truth_row((Text(column) for column in columns), widths)
+            yield Text(border)
+
+        yield format_truth_row((format_bool(value) for value in row.values()), widths)
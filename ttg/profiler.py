@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import cProfile
+import os
+import time
+import tracemalloc
+from contextlib import (
+    ExitStack,
+    contextmanager,
+    redirect_stderr,
+    redirect_stdout,
+)
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Callable, Iterator
+
+from rich.table import Table
+
+from ttg.console import rich_console_error
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from ttg.program import ProgramOptions
+
+
+class ProgramHooks:
+    """Callbacks around each run of the program and each of its phases.
+
+    The phases are `tokenize`, `validate`, `parse`, `simplify` (if enabled),
+    `evaluate`, `format` and `print` (or `stream`, which interleaves evaluating,
+    formatting & printing the rows). Every callback does nothing by default, so
+    subclasses only need to override the ones they use.
+    """
+
+    enabled: bool = False
+    "Whether the callbacks are used, or else the counts costly to get are skipped"
+
+    def start(self, formula: str) -> None:
+        """Call before running the program for a formula."""
+
+    def enter(self, phase: str) -> None:
+        """Call before each phase."""
+
+    def exit(self, phase: str) -> None:
+        """Call after each phase, even if it failed."""
+
+    def count(self, name: str, value: int) -> None:
+        """Call with the count of `tokens`, `nodes` or `rows` once known."""
+
+    def finish(self) -> None:
+        """Call after running the program for a formula, even if it failed."""
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """Wrap a phase with `enter` & `exit`."""
+        self.enter(phase)
+        try:
+            yield
+        finally:
+            self.exit(phase)
+
+
+@dataclass
+class PhaseProfile:
+    """Measurements of a single phase of the program."""
+
+    seconds: float = 0.0
+    "Wall time, measured while the allocations aren't traced"
+
+    peak_bytes: int = 0
+    "Peak of the memory allocated during the phase, measured in a separate run"
+
+
+class Profiler(ProgramHooks):
+    """Hooks measuring the time & the allocations of each phase of the program.
+
+    Tracing the allocations slows down every phase, so the program is run twice
+    (see `run_profiled`): the phases are timed in the first run, then only their
+    allocations are traced with `tracemalloc` in the second run. Tracing is
+    restarted for every phase, so that its peak only counts the allocations of
+    that phase. If an output path is given, the first run is also profiled with
+    `cProfile` and its stats are written into the file, e.g. for `snakeviz` or
+    `pstats`.
+    """
+
+    enabled = True
+
+    output: Path | None
+    profile: cProfile.Profile | None
+
+    formula: str
+    phases: dict[str, PhaseProfile]
+    counts: dict[str, int]
+    started: float
+
+    tracing: bool
+    "Whether the current run traces the allocations, instead of timing the phases"
+
+    def __init__(self, output: Path | None = None) -> None:  # noqa: D107
+        self.output = output
+        self.profile = None
+        self.formula = ""
+        self.phases = {}
+        self.counts = {}
+        self.started = 0.0
+        self.tracing = False
+
+    def start(self, formula: str) -> None:  # noqa: D102
+        if self.tracing:  # keep the times of the first run
+            return
+        self.formula = formula
+        self.phases = {}
+        self.counts = {}
+        if self.output is not None:
+            self.profile = self.profile or cProfile.Profile()
+            self.profile.enable()
+
+    def enter(self, phase: str) -> None:  # noqa: D102, ARG002
+        if self.tracing:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            tracemalloc.start()
+        self.started = time.perf_counter()
+
+    def exit(self, phase: str) -> None:  # noqa: D102
+        seconds = time.perf_counter() - self.started
+        profile = self.phases.setdefault(phase, PhaseProfile())
+        if not self.tracing:
+            profile.seconds += seconds
+            return
+
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        profile.peak_bytes = max(profile.peak_bytes, peak)
+
+    def count(self, name: str, value: int) -> None:  # noqa: D102
+        self.counts[name] = value
+
+    def finish(self) -> None:  # noqa: D102
+        if not self.tracing and self.profile is not None and self.output is not None:
+            self.profile.disable()
+            self.profile.dump_stats(self.output)
+
+    def report(self) -> None:
+        """Print the measurements of each phase, once both runs are finished."""
+        rich_console_error.print()
+        rich_console_error.print(format_profile(self))
+
+    def rows_per_second(self) -> float | None:
+        """Get the count of rows evaluated per second, if any."""
+        evaluate = self.phases.get("evaluate") or self.phases.get("stream")
+        rows = self.counts.get("rows")
+        if evaluate is None or rows is None or not evaluate.seconds:
+            return None
+        return rows / evaluate.seconds
+
+
+def format_profile(profiler: Profiler) -> Table:
+    """Format the measurements of each phase for console display."""
+    table = Table(title=f"Profile of '{profiler.formula}'")
+    table.add_column("Phase")
+    table.add_column("Time (ms)", justify="right")
+    table.add_column("Peak (KiB)", justify="right")
+
+    for phase, profile in profiler.phases.items():
+        table.add_row(
+            phase,
+            f"{profile.seconds * 1000:.3f}",
+            f"{profile.peak_bytes / 1024:,.1f}",
+        )
+
+    counts = [f"{name}: {value:,}" for name, value in profiler.counts.items()]
+    rows_per_second = profiler.rows_per_second()
+    if rows_per_second is not None:
+        counts.append(f"rows/s: {rows_per_second:,.0f}")
+    table.caption = ", ".join(counts)
+    return table
+
+
+def run_profiled(
+    run: Callable[[ProgramOptions], None],
+    options: ProgramOptions,
+) -> None:
+    """Run the program, then run it again to trace its allocations if profiling.
+
+    The second run is given the options without the cache, so that its phases
+    are repeated, and its output is discarded (though files given with
+    `--output` are written again).
+    """
+    run(options)
+    hooks = options.hooks
+    if not isinstance(hooks, Profiler):
+        return
+
+    hooks.tracing = True
+    try:
+        with ExitStack() as stack:
+            devnull = stack.enter_context(open(os.devnull, "w"))  # noqa: PTH123
+            stack.enter_context(redirect_stdout(devnull))
+            stack.enter_context(redirect_stderr(devnull))
+            run(replace(options, cache=None))
+    finally:
+        hooks.tracing = False
+    hooks.report()
@@ -1,25 +1,135 @@
 from __future__ import annotations
 
 import sys
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import TYPE_CHECKING
 
 from rich.highlighter import Highlighter
 from rich.pretty import Pretty
 from rich.text import Text
 
 from ttg.console import rich_console, rich_console_error
-from ttg.core.evaluator import evaluate
-from ttg.core.lexer import Token, tokenize
-from ttg.core.parser import ParserError, parse
-from ttg.formatter import format_truth_table
+from ttg.core.arena import build_arena
+from ttg.core.bdd import find_difference
+from ttg.core.bitwise import (
+    evaluate_many,
+    evaluate_packed,
+    evaluate_parallel,
+    evaluate_range,
+    evaluate_to_file,
+)
+from ttg.core.cache import cache_key
+from ttg.core.evaluator import (
+    Evaluator,
+    column_groups,
+    evaluate_where,
+    final_label,
+    formula_variables,
+    iter_truth_table,
+    select_columns,
+)
+from ttg.core.lexer import Token, tokenize, tokenize_many
+from ttg.core.mapped import open_truth_table
+from ttg.core.minimize import NormalForm, exact_variables, minimize
+from ttg.core.parser import Expr, ParserError, parse
+from ttg.core.sat import CheckMode, check
+from ttg.core.simplify import simplify
+from ttg.exporter import OutputFormat, export_truth_table
+from ttg.formatter import format_truth_rows, format_truth_table
+from ttg.profiler import ProgramHooks, run_profiled
+from ttg.renderer import CellStyle, Renderer, render_truth_table, use_rich
 
+if TYPE_CHECKING:
+    from pathlib import Path
 
-def program(formula: str, inspect: bool) -> None:
+    from ttg.core.cache import CacheEntry, CacheKey, FormulaCache
+    from ttg.core.table import PackedTruthTable, TruthTableLike
+
+
+shared_formulas = 64
+"Count of formulas of a file evaluated together, sharing their sub-expressions"
+
+shared_max_variables = 16
+"Most variables of a formula evaluated together with the other formulas"
+
+
+@dataclass
+class ProgramOptions:
+    """Options for evaluating & displaying the truth table of a formula."""
+
+    stream: bool = False
+    "Print the rows of the truth table as they are evaluated"
+
+    jobs: int = 1
+    "Count of processes to evaluate the rows of the truth table with"
+
+    cache: FormulaCache | None = None
+    "Cache of the trees & truth tables of the formulas evaluated before"
+
+    check: CheckMode | None = None
+    "Only check if the formula is satisfiable, a tautology, or a contradiction"
+
+    equiv: str | None = None
+    "Only check if the formula is equivalent to another formula"
+
+    where: str | None = None
+    "Only keep the rows where the formula is `true`, `false`, or where another is"
+
+    limit: int | None = None
+    "Stop evaluating once this count of rows is kept"
+
+    columns: str | None = None
+    "Comma-separated columns to keep: `vars`, `final`, or labels of sub-expressions"
+
+    rows: str | None = None
+    "Only keep the rows from `START` to `STOP` (`START:STOP`) of the truth table"
+
+    output_format: OutputFormat | None = None
+    "Write the truth table in this format instead of printing it"
+
+    output: Path | None = None
+    "File to write the truth table into, or the standard output if `None`"
+
+    renderer: Renderer = "auto"
+    "Print the truth table with `rich`, or as plain text which is faster"
+
+    cells: CellStyle = "tf"
+    "Cells of the truth table printed as plain text"
+
+    hooks: ProgramHooks = field(default_factory=ProgramHooks)
+    "Callbacks around each phase of the program, e.g. for profiling"
+
+    simplify: bool = False
+    "Rewrite the formula into a smaller equivalent formula before evaluating it"
+
+    minimize: NormalForm | None = None
+    "Only derive a minimized DNF or CNF from the final column of the truth table"
+
+    exact_variables: int = exact_variables
+    "Largest count of variables minimized exactly, instead of heuristically"
+
+
+def program(formula: str, inspect: bool, options: ProgramOptions | None = None) -> None:
     """Central function for the program's logic."""
+    if options is None:
+        options = ProgramOptions()
+
+    run_profiled(
+        lambda run_options: run_program(formula, inspect, run_options),
+        options,
+    )
+
+
+def run_program(formula: str, inspect: bool, options: ProgramOptions) -> None:
+    """Run the program once for a formula, see `program`."""
     if inspect:
         rich_console.print()
         rich_console.print("Comand-Line Arguments (sys.argv): ", end="")
         rich_console.print(sys.argv)
 
+    hooks = options.hooks
+    hooks.start(formula)
     try:
         if inspect:
             rich_console.print()
@@ -27,28 +137,82 @@ def program(formula: str, inspect: bool) -> None:
             rich_console.print()
             rich_console.print({"input_length": len(formula)})
 
-        tokens = tokenize(formula)
+        with hooks.phase("tokenize"):
+            tokens = tokenize(formula)
+        hooks.count("tokens", len(tokens))
         if inspect:
             rich_console.print()
             rich_console.print({"token_count": len(tokens)})
             rich_console.print(tokens)
-        validate_tokens(formula, tokens)
+        with hooks.phase("validate"):
+            validate_tokens(formula, tokens)
 
-        try:
-            tree = parse(tokens)
-        except ParserError as exc:
-            display_error(formula, [exc.token], exc.message)
-            raise
+        cache = options.cache
+        with hooks.phase("parse"):
+            entry = cache.get(tokens) if cache is not None else None
+            tree = entry.tree if entry else parse_tokens(formula, tokens)
+        if options.simplify:  # evaluate the simplified formula instead
+            formula, tokens, tree = simplify_formula(formula, tokens, tree, options)
+            entry = cache.get(tokens) if cache is not None else None
+        count_nodes(tree, hooks)
         if inspect:
             rich_console.print()
             rich_console.print({"expression": str(tree)})
             rich_console.print(tree)
+            if cache is not None:
+                rich_console.print({"cache": cache.stats()})
 
-        truth_table = evaluate(tokens, tree)
+        display_result(formula, tokens, tree, options, entry)
+    except Exception as exc:
+        rich_console_error.print()
+        if inspect:
+            rich_console_error.print_exception(show_locals=True)
+        else:
+            rich_console_error.print("Exception caught: ", style="bold red", end="")
+            rich_console_error.print(Pretty(exc))
+    finally:
+        hooks.finish()
 
-        rich_table = format_truth_table(truth_table, title=formula)
-        rich_console.print()
-        rich_console.print(rich_table)
+
+def count_nodes(tree: Expr, hooks: ProgramHooks) -> None:
+    """Count the nodes of the tree, only if enabled since it builds its arena."""
+    if hooks.enabled:
+        hooks.count("nodes", len(build_arena(tree)))
+
+
+def program_file(
+    path: Path,
+    inspect: bool,
+    options: ProgramOptions | None = None,
+) -> None:
+    """Central function for displaying a truth table file written before."""
+    if options is None:
+        options = ProgramOptions()
+
+    run_profiled(
+        lambda run_options: run_program_file(path, inspect, run_options),
+        options,
+    )
+
+
+def run_program_file(path: Path, inspect: bool, options: ProgramOptions) -> None:
+    """Display a truth table file once, see `program_file`."""
+    hooks = options.hooks
+    hooks.start(str(path))
+    try:
+        with open_truth_table(path) as table:
+            if inspect:
+                rich_console.print()
+                rich_console.rule(str(path))
+                rich_console.print()
+                rich_console.print(table.header)
+
+            truth_table: PackedTruthTable = table
+            if options.rows is not None:
+                start, stop, _ = parse_rows(options.rows).indices(table.rows)
+                truth_table = table.window(start, stop)
+            hooks.count("rows", truth_table.rows)
+            output_truth_table(truth_table, path.name, options)
     except Exception as exc:
         rich_console_error.print()
         if inspect:
@@ -56,6 +220,361 @@ def program(formula: str, inspect: bool) -> None:
         else:
             rich_console_error.print("Exception caught: ", style="bold red", end="")
             rich_console_error.print(Pretty(exc))
+    finally:
+        hooks.finish()
+
+
+def evaluate_shared(formulas: list[str], options: ProgramOptions) -> None:
+    """Evaluate the truth tables of several formulas at once into the cache.
+
+    The formulas are evaluated with `evaluate_many`, so their shared
+    sub-expressions are only evaluated once, then `program` finds each truth
+    table in the cache. Invalid & already cached formulas are skipped, as well
+    as every formula if the selected options don't display a truth table.
+    """
+    cache = options.cache
+    if cache is None or not displays_truth_table(options):
+        return
+
+    parsed: dict[CacheKey, tuple[list[Token], Expr]] = {}
+    for tokens in tokenize_many(formulas):
+        variables = formula_variables(tokens)
+        if any(token.type == "invalid" for token in tokens) or cache.contains(tokens):
+            continue
+        if not variables or len(variables) > shared_max_variables:
+            continue
+        try:
+            parsed.setdefault(cache_key(tokens), (tokens, parse(tokens)))
+        except ParserError:
+            continue  # displayed by `program` instead
+
+    tables = evaluate_many([tree for _, tree in parsed.values()])
+    for (tokens, tree), table in zip(parsed.values(), tables):
+        cache.put(tokens, tree, table)
+
+
+def displays_truth_table(options: ProgramOptions) -> bool:
+    """Check if the entire truth table of each formula is evaluated & displayed."""
+    checks = (options.check, options.equiv, options.minimize)
+    filters = (options.where, options.limit, options.rows)
+    return (
+        not options.stream
+        and not options.simplify
+        and all(x is None for x in (*checks, *filters))
+    )
+
+
+def simplify_formula(
+    formula: str,
+    tokens: list[Token],
+    tree: Expr,
+    options: ProgramOptions,
+) -> tuple[str, list[Token], Expr]:
+    """Simplify the tree of the formula, and print the count of nodes removed."""
+    with options.hooks.phase("simplify"):
+        simplified = simplify(tree)
+    before, after = len(build_arena(tree)), len(build_arena(simplified))
+
+    # keep the standard output clean if the truth table is written into it
+    console = rich_console
+    if options.output_format is not None and options.output is None:
+        console = rich_console_error
+    console.print()
+    console.print("Simplified", style="bold", end=": ")
+    console.print(Text(f"'{simplified}'", style="green"), end=" ")
+    console.print(f"({before} -> {after} nodes, {(after - before) / before:+.0%})")
+
+    if simplified is tree:
+        return formula, tokens, tree
+
+    # the rows of the truth table only cover the variables still used
+    simplified_tokens = tokenize(simplified.label)
+    kept = formula_variables(simplified_tokens)
+    dropped = [x for x in formula_variables(tokens) if x not in kept]
+    if dropped:
+        console.print(
+            f"Dropped variable(s) {', '.join(dropped)}, which the formula doesn't "
+            f"depend on: the truth table has {1 << len(kept)} instead of "
+            f"{1 << len(formula_variables(tokens))} rows",
+            style="yellow",
+        )
+    return simplified.label, simplified_tokens, simplified
+
+
+def parse_tokens(formula: str, tokens: list[Token]) -> Expr:
+    """Parse the tokens and print the error of an invalid grammar."""
+    try:
+        return parse(tokens)
+    except ParserError as exc:
+        display_error(formula, [exc.token], exc.message)
+        raise
+
+
+def display_result(
+    formula: str,
+    tokens: list[Token],
+    tree: Expr,
+    options: ProgramOptions,
+    entry: CacheEntry | None = None,
+) -> None:
+    """Print the answer of the selected check, or else the truth table."""
+    if options.equiv is not None:
+        with options.hooks.phase("evaluate"):
+            display_equivalence(formula, tree, options.equiv)
+    elif options.check is not None:
+        with options.hooks.phase("evaluate"):
+            display_check(formula, tree, options.check)
+    elif options.minimize is not None:
+        with options.hooks.phase("evaluate"):
+            display_minimized(formula, tokens, tree, options)
+    else:
+        display_truth_table(formula, tokens, tree, options, entry)
+
+
+def display_truth_table(
+    formula: str,
+    tokens: list[Token],
+    tree: Expr,
+    options: ProgramOptions,
+    entry: CacheEntry | None = None,
+) -> None:
+    """Evaluate the formula, unless cached, and print or write its truth table."""
+    where = None if options.where is None else parse_where(options.where, tokens)
+    columns = None
+    if options.columns is not None:
+        columns = parse_columns(options.columns, tokens, tree)
+    window = None
+    if options.rows is not None:
+        count = 1 << len(formula_variables(tokens))
+        window = range(*parse_rows(options.rows).indices(count))
+
+    hooks = options.hooks
+    if options.stream and options.output_format is None:
+        rich_console.print()
+        rows = iter_truth_table(tokens, tree, where, columns, window)
+        with hooks.phase("stream"):
+            for line in format_truth_rows(islice(rows, options.limit), formula):
+                rich_console.print(line)
+        return
+
+    with hooks.phase("evaluate"):
+        if where is not None or options.limit is not None:
+            limit = options.limit
+            truth_table = evaluate_where(tokens, tree, where, limit, columns, window)
+        elif window is not None:
+            truth_table = evaluate_rows(tokens, tree, window, entry, columns)
+        elif entry is None and options.output_format == "bin" and options.output:
+            # write large truth tables into the file without holding them in memory
+            evaluate_to_file(tokens, tree, options.output, columns)
+            truth_table = None
+        else:
+            truth_table = evaluate_truth_table(tokens, tree, options, entry, columns)
+
+    if truth_table is None and options.output is not None:
+        rows = 1 << len(formula_variables(tokens))
+        hooks.count("rows", rows)
+        display_written(rows, options.output)
+    elif truth_table is not None:
+        hooks.count("rows", len(next(iter(truth_table.values()), ())))
+        output_truth_table(truth_table, formula, options)
+
+
+def output_truth_table(
+    truth_table: TruthTableLike,
+    title: str,
+    options: ProgramOptions,
+) -> None:
+    """Write the truth table in the selected format, or else print it."""
+    hooks = options.hooks
+    if options.output_format is not None:
+        with hooks.phase("print"):
+            export_truth_table(truth_table, options.output_format, options.output)
+        if options.output is not None:
+            count = len(next(iter(truth_table.values()), ()))
+            display_written(count, options.output)
+        return
+
+    rich_console.print()
+    if use_rich(options.renderer, truth_table):
+        with hooks.phase("format"):
+            table = format_truth_table(truth_table, title=title)
+        with hooks.phase("print"):
+            rich_console.print(table)
+    else:
+        with hooks.phase("print"):
+            render_truth_table(truth_table, title, options.cells)
+
+
+def display_written(count: int, path: Path) -> None:
+    """Print the count of rows written into a file."""
+    rich_console.print()
+    rich_console.print(f"Wrote {count} row(s) into", end=" ")
+    rich_console.print(Text(f"'{path}'", style="green"))
+
+
+def evaluate_truth_table(
+    tokens: list[Token],
+    tree: Expr,
+    options: ProgramOptions,
+    entry: CacheEntry | None = None,
+    columns: set[str] | None = None,
+) -> TruthTableLike:
+    """Evaluate the entire truth table of the formula, unless cached."""
+    if entry is not None:
+        return entry.table if columns is None else entry.table.select(columns)
+
+    truth_table = evaluate_parallel(tokens, tree, options.jobs, columns)
+    if options.cache is not None and columns is None:
+        options.cache.put(tokens, tree, truth_table)
+    return truth_table
+
+
+def evaluate_rows(
+    tokens: list[Token],
+    tree: Expr,
+    window: range,
+    entry: CacheEntry | None = None,
+    columns: set[str] | None = None,
+) -> PackedTruthTable:
+    """Evaluate only the rows of the window, unless the truth table is cached."""
+    if entry is None:
+        return evaluate_range(tokens, tree, window.start, window.stop, columns)
+    table = entry.table if columns is None else entry.table.select(columns)
+    return table.window(window.start, window.stop)
+
+
+def parse_columns(selection: str, tokens: list[Token], tree: Expr) -> set[str]:
+    """Parse the selected columns, matching sub-expressions by their labels."""
+    variables = formula_variables(tokens)
+    names: list[str] = []
+    for name in selection.split(","):
+        name = name.strip()  # noqa: PLW2901
+        if name.lower() in column_groups:
+            names.append(name.lower())
+        elif name in variables:
+            names.append(name)
+        else:
+            # match the label of the sub-expression regardless of its spacing
+            names.append(final_label(parse_tokens(name, tokenize(name))))
+
+    columns = select_columns(tree, variables, names)
+    arena = build_arena(tree)
+    labels = {*variables, *(arena.labels[node] for node in arena.columns())}
+    unknown_columns = sorted(columns - labels)
+    if unknown_columns:
+        raise Exception("Unknown Column(s) Found", unknown_columns)
+    return columns
+
+
+def parse_rows(rows: str) -> slice:
+    """Parse a range of rows (e.g. `10:20`, `:20`, `-10:`) or a single row."""
+    try:
+        if ":" not in rows:
+            index = int(rows)
+            return slice(index, index + 1 or None)
+        start, stop = (int(x) if x.strip() else None for x in rows.split(":"))
+    except ValueError:
+        raise Exception("Invalid Row Range", rows) from None
+    return slice(start, stop)
+
+
+def parse_where(where: str, tokens: list[Token]) -> Expr | bool:
+    """Parse the filter of the rows, which only uses the variables of the formula."""
+    if where.lower() in ("true", "false"):
+        return where.lower() == "true"
+
+    where_tokens = tokenize(where)
+    validate_tokens(where, where_tokens)
+    where_tree = parse_tokens(where, where_tokens)
+
+    variables = formula_variables(tokens)
+    unknown_tokens = [
+        token
+        for token in where_tokens
+        if token.type == "variable" and token.value not in variables
+    ]
+    if unknown_tokens:
+        display_error(where, unknown_tokens, "Unknown Variable(s) Found")
+        raise Exception("Unknown Variable(s) Found", where)
+    return where_tree
+
+
+check_answers: dict[tuple[CheckMode, bool], tuple[str, str]] = {
+    ("sat", True): ("Satisfiable", "Witness"),
+    ("sat", False): ("Unsatisfiable", ""),
+    ("taut", True): ("Tautology", ""),
+    ("taut", False): ("Not a Tautology", "Counterexample"),
+    ("contra", True): ("Contradiction", ""),
+    ("contra", False): ("Not a Contradiction", "Witness"),
+}
+"The answer & the title of the assignment proving it for each result of a check"
+
+
+def display_check(formula: str, tree: Expr, mode: CheckMode) -> None:
+    """Check the formula without evaluating its truth table, and print the answer."""
+    result = check(tree, mode)
+    answer, title = check_answers[mode, result.holds]
+
+    rich_console.print()
+    rich_console.print(answer, style="bold", end=": ")
+    rich_console.print(Text(f"'{formula}'", style="green"))
+    if result.assignment is None:
+        return
+
+    # display the row of the assignment in the truth table
+    values = Evaluator().evaluate(tree, result.assignment)
+    row = {key: [value] for key, value in values.items()}
+    rich_console.print(format_truth_table(row, title=title))
+
+
+def display_minimized(
+    formula: str,
+    tokens: list[Token],
+    tree: Expr,
+    options: ProgramOptions,
+) -> None:
+    """Minimize the final column of the bit-packed truth table, and print it."""
+    final = final_label(tree)
+    column = evaluate_packed(tokens, tree, {final})[final]
+    form = options.minimize or "dnf"
+    minimized = minimize(
+        column,
+        formula_variables(tokens),
+        form,
+        options.exact_variables,
+    )
+
+    rich_console.print()
+    rich_console.print(f"Minimized {form.upper()}", style="bold", end=": ")
+    rich_console.print(Text(f"'{minimized}'", style="green"))
+    method = "exact" if minimized.exact else "heuristic"
+    terms = "term(s)" if form == "dnf" else "clause(s)"
+    rich_console.print(
+        f"{len(minimized.cubes)} {terms}, {minimized.literals} literal(s), "
+        f"{method} (from '{formula}')",
+        style="bright_black",
+    )
+
+
+def display_equivalence(formula: str, tree: Expr, other: str) -> None:
+    """Compare the formula with another formula, and print the answer."""
+    other_tokens = tokenize(other)
+    validate_tokens(other, other_tokens)
+    other_tree = parse_tokens(other, other_tokens)
+    difference = find_difference(tree, other_tree)
+
+    rich_console.print()
+    answer = "Equivalent" if difference is None else "Not Equivalent"
+    rich_console.print(answer, style="bold", end=": ")
+    rich_console.print(Text(f"'{formula}' & '{other}'", style="green"))
+    if difference is None:
+        return
+
+    # display the row of the assignment in the truth tables of both formulas
+    values = Evaluator().evaluate(tree, difference)
+    values.update(Evaluator().evaluate(other_tree, difference))
+    row = {key: [value] for key, value in values.items()}
+    rich_console.print(format_truth_table(row, title="Counterexample"))
 
 
 class TokenHighlighter(Highlighter):
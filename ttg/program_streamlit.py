@@ -10,9 +10,20 @@ import re
 import pandas as pd
 import streamlit as st
 
-from ttg.core.evaluator import evaluate
+from ttg.core.bdd import count_models
+from ttg.core.bitwise import evaluate_range
+from ttg.core.evaluator import TruthTable, formula_variables
 from ttg.core.lexer import Token, tokenize
-from ttg.core.parser import ParserError, parse
+from ttg.core.parser import Expr, ParserError, parse
+
+row_budget = int(os.environ.get("TTG_ROW_BUDGET", 1 << 16))
+"Maximum count of rows of a truth table which can be browsed page by page"
+
+page_sizes = (50, 100, 500, 1000)
+"Choices of the count of rows displayed on each page"
+
+summary_rows = 100
+"Count of the first rows displayed with the summary of larger truth tables"
 
 
 def page() -> None:
@@ -69,19 +80,79 @@ def program() -> None:
     validate_tokens(formula, tokens)
 
     try:
-        tree = parse(tokens)
+        tree = parse_formula(formula)
     except ParserError as exc:
         st.error(highlight_tokens(formula, [exc.token]))
         raise
     if inspect:
         st.json(tree.json())
 
-    truth_table = evaluate(tokens, tree)
-    dataframe = pd.DataFrame(truth_table)
-    dataframe.index += 1  # type: ignore  # noqa: PGH003
+    rows = 1 << len(formula_variables(tokens))
+    if rows > row_budget:
+        display_summary(formula, rows)
+    else:
+        display_page(formula, rows)
+
+
+def display_page(formula: str, rows: int) -> None:
+    """Display a single page of the truth table, evaluating only its rows."""
+    size = st.selectbox(label="Rows per Page", options=page_sizes, index=1)
+    pages = -(-rows // size)
+    number = st.number_input(label="Page", min_value=1, max_value=pages, value=1)
+    start = (int(number) - 1) * size
+    stop = min(start + size, rows)
+
+    st.caption(f"Rows {start + 1:,} to {stop:,} of {rows:,}")
+    display_rows(evaluate_rows(formula, start, stop), start)
+
+
+def display_summary(formula: str, rows: int) -> None:
+    """Display the counts of a truth table too large to browse, and its first rows."""
+    st.warning(
+        f"The truth table has {rows:,} rows, which is over the budget of "
+        f"{row_budget:,} rows, so only a summary is displayed.",
+    )
+    count = count_true_rows(formula)
+    st.json(
+        {
+            "satisfiable": count > 0,
+            "tautology": count == rows,
+            "true_rows": count,
+            "rows": rows,
+        },
+    )
+
+    stop = min(summary_rows, rows)
+    st.caption(f"First {stop:,} rows")
+    display_rows(evaluate_rows(formula, 0, stop), 0)
+
+
+def display_rows(table: TruthTable, start: int) -> None:
+    """Display the rows of a truth table numbered from the start-th row."""
+    dataframe = pd.DataFrame(table)
+    dataframe.index += start + 1  # type: ignore  # noqa: PGH003
     st.dataframe(dataframe)  # type: ignore  # noqa: PGH003
 
 
+@st.cache_resource(max_entries=256)
+def parse_formula(formula: str) -> Expr:
+    """Parse a formula once, shared across all sessions."""
+    return parse(tokenize(formula))
+
+
+@st.cache_data(max_entries=1024)
+def evaluate_rows(formula: str, start: int, stop: int) -> TruthTable:
+    """Evaluate only the rows from start to stop of the truth table of a formula."""
+    tokens = tokenize(formula)
+    return evaluate_range(tokens, parse_formula(formula), start, stop).to_dict()
+
+
+@st.cache_data(max_entries=256)
+def count_true_rows(formula: str) -> int:
+    """Count the rows for which a formula is `True` without evaluating them."""
+    return count_models(parse_formula(formula))
+
+
 def validate_tokens(formula: str, tokens: list[Token]) -> None:
     """Check invalid tokens and print the error."""
     invalid_tokens = list(filter(lambda x: x.type == "invalid", tokens))
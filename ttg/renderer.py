@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+from typing import IO, TYPE_CHECKING, Literal
+
+from ttg.console import rich_console
+from ttg.core.table import PackedTruthTable
+from ttg.exporter import write_cells
+
+if TYPE_CHECKING:
+    from ttg.core.table import TruthTableLike
+
+Renderer = Literal["auto", "rich", "plain"]
+"Renderers of the truth table on the console, `auto` picks by the size of the table"
+
+CellStyle = Literal["tf", "10"]
+"Cells of the plain renderer, either `T` & `F` or `1` & `0`"
+
+rich_max_rows = 256
+"Maximum count of rows still rendered with `rich` by the `auto` renderer"
+
+cell_styles: dict[CellStyle, tuple[str, str]] = {"tf": ("F", "T"), "10": ("0", "1")}
+"The `False` & `True` cells of each style"
+
+cell_colors = ("\x1b[3;31m", "\x1b[3;32m")
+"ANSI escape codes of the `False` & `True` cells, same as `format_bool`"
+
+reset_color = "\x1b[0m"
+
+default_pager = "more" if sys.platform == "win32" else "less -FRX"
+"Pager used if the `PAGER` environment variable is not set"
+
+
+def use_rich(renderer: Renderer, table: TruthTableLike) -> bool:
+    """Check if the truth table is rendered with `rich` instead of plain text."""
+    if renderer != "auto":
+        return renderer == "rich"
+    rows = len(next(iter(table.values()), ()))
+    return rows <= rich_max_rows
+
+
+def render_plain(
+    table: PackedTruthTable,
+    file: IO[bytes],
+    title: str = "Truth Table",
+    style: CellStyle = "tf",
+    color: bool = False,
+) -> None:
+    """Write the truth table as plain text, same as the lines of `format_truth_rows`.
+
+    The width of each column is based solely on its label, and every cell of
+    the same column has the same width (the escape codes of both colors too),
+    so the rows are laid out with `write_cells` in chunks instead of one by one.
+    """
+    labels = list(table.columns)
+    widths = [len(label) for label in labels]
+    border = "─" * (sum(widths) + 3 * len(widths) + 1)
+
+    header = [title.center(len(border)), border]
+    header.append("│" + "│".join(f" {label} " for label in labels) + "│")
+    header.append(border)
+    file.write(("\n".join(header) + "\n").encode())
+
+    false_cell, true_cell = cell_styles[style]
+    if color:
+        false_cell = cell_colors[0] + false_cell + reset_color
+        true_cell = cell_colors[1] + true_cell + reset_color
+
+    # the separators pad each cell to center it within the width of its column
+    separators: list[str] = []
+    right = ""
+    for width in widths:
+        left = " " * ((width - 1) // 2 + 1)
+        separators.append(right + "│" + left)
+        right = " " * (width + 1 - len(left))
+    separators.append(right + "│\n")
+
+    if labels:
+        cells = (false_cell.encode(), true_cell.encode())
+        write_cells(table, file, [x.encode() for x in separators], cells)
+    file.write((border + "\n").encode())
+
+
+def open_pager() -> subprocess.Popen[bytes] | None:
+    """Start the pager of the user reading from a pipe, if it exists."""
+    command = shlex.split(os.environ.get("PAGER") or default_pager)
+    if not command or shutil.which(command[0]) is None:
+        return None
+    return subprocess.Popen(command, stdin=subprocess.PIPE)  # noqa: S603
+
+
+def render_truth_table(
+    table: TruthTableLike,
+    title: str = "Truth Table",
+    style: CellStyle = "tf",
+) -> None:
+    # wrapper function for convenience, writes into the standard output through
+    # a pager if it's a terminal and the table doesn't fit on the screen
+
+    if not isinstance(table, PackedTruthTable):
+        table = PackedTruthTable.from_table(table)
+    color = rich_console.is_terminal and not rich_console.no_color
+    sys.stdout.flush()
+
+    pager = None
+    if sys.stdout.isatty() and table.rows + 5 > rich_console.height:
+        pager = open_pager()
+    if pager is None or pager.stdin is None:
+        render_plain(table, sys.stdout.buffer, title, style, color)
+        sys.stdout.buffer.flush()
+        return
+
+    try:
+        with pager.stdin:
+            render_plain(table, pager.stdin, title, style, color)
+    except BrokenPipeError:
+        pass  # the pager was closed before reading the entire table
+    pager.wait()